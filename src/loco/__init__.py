@@ -1,5 +1,7 @@
 """Loco - Lightning-fast localhost tunneling."""
 
+from functools import lru_cache
+
 __version__ = "0.1.0"
 __author__ = "Daniel Brai"
 __email__ = "danielbrai.dev@gmail.com"
@@ -27,6 +29,26 @@ def get_version() -> str:
     return __version__
 
 
+@lru_cache(maxsize=1)
 def get_ascii_banner() -> str:
     """Get the ASCII art banner with version."""
     return LOCO_ASCII_ART.format(version=__version__)
+
+
+def _classify_banner_line(index: int, line: str) -> str:
+    """Get the Rich style for a line of the ASCII banner."""
+    if index < 6:  # ASCII art lines
+        return "bold cyan"
+    if "Lightning-fast" in line:
+        return "bold white"
+    if "that's anything but crazy" in line:
+        return "italic white"
+    if "VERSION" in line:
+        return "bold green"
+    return ""
+
+
+BANNER_LINES: list[tuple[str, str]] = [
+    (_classify_banner_line(i, line), line)
+    for i, line in enumerate(get_ascii_banner().split("\n"))
+]
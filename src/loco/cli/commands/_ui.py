@@ -0,0 +1,39 @@
+"""Shared Rich UI and terminal helpers for CLI commands."""
+
+from __future__ import annotations
+
+import asyncio
+import signal
+from typing import TYPE_CHECKING
+
+from rich.progress import Progress, SpinnerColumn, TextColumn
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+_SPINNER_COLUMN = SpinnerColumn()
+_TEXT_COLUMN = TextColumn("[progress.description]{task.description}")
+
+
+def make_progress(console: Console) -> Progress:
+    """Create a spinner progress display reusing the shared column objects."""
+    return Progress(_SPINNER_COLUMN, _TEXT_COLUMN, console=console)
+
+
+async def wait_for_interrupt() -> None:
+    """Wait for Ctrl+C without periodically waking the event loop."""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    try:
+        loop.add_signal_handler(signal.SIGINT, stop_event.set)
+    except (NotImplementedError, RuntimeError):
+        # Event loops without signal support (e.g. on Windows) surface Ctrl+C
+        # as KeyboardInterrupt or cancellation of the running task instead.
+        await stop_event.wait()
+        return
+
+    try:
+        await stop_event.wait()
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
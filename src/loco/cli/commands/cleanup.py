@@ -1,8 +1,18 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.prompt import Confirm
 
-from ...network.manager import TunnelManager
+from ...core.exceptions import StorageError, TunnelError
+from ...core.models import ACTIVE_STATUSES, STOPPED_STATUSES
+from ...network.manager import get_manager
+from ._ui import make_progress
+
+if TYPE_CHECKING:
+    from ...core.models import TunnelState
 
 console = Console()
 
@@ -10,11 +20,10 @@ console = Console()
 async def cleanup_tunnels_async(force: bool = False) -> None:
     """Clean up stopped tunnels."""
     try:
-        manager = TunnelManager()
-        await manager.load_from_storage()
+        manager = get_manager()
 
         tunnels = await manager.list_tunnels()
-        stopped_tunnels = [t for t in tunnels if t.status.value in ["stopped", "error"]]
+        stopped_tunnels = [t for t in tunnels if t.status in STOPPED_STATUSES]
 
         if not stopped_tunnels:
             console.print("[green]No stopped tunnels to clean up\n")
@@ -36,14 +45,12 @@ async def cleanup_tunnels_async(force: bool = False) -> None:
             console.print("[yellow]Cleanup cancelled")
             return
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
+        with make_progress(console) as progress:
             task = progress.add_task("\nCleaning up tunnels...", total=None)
 
-            cleaned_count = await manager.cleanup_stopped_tunnels()
+            cleaned_count = await manager.cleanup_stopped_tunnels(
+                [t.config.tunnel_id for t in stopped_tunnels]
+            )
 
             progress.update(task, description="Cleanup complete\n")
 
@@ -59,8 +66,7 @@ async def cleanup_tunnels_async(force: bool = False) -> None:
 async def cleanup_all_async(force: bool = False) -> None:
     """Clean up all tunnels (including active ones)."""
     try:
-        manager = TunnelManager()
-        await manager.load_from_storage()
+        manager = get_manager()
 
         tunnels = await manager.list_tunnels()
 
@@ -93,29 +99,58 @@ async def cleanup_all_async(force: bool = False) -> None:
                 console.print("[yellow]Cleanup cancelled")
                 return
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            active_count = len(
-                [t for t in tunnels if t.status.value in ["active", "starting"]]
-            )
+        with make_progress(console) as progress:
+            active_count = sum(1 for t in tunnels if t.status in ACTIVE_STATUSES)
+            task = progress.add_task("Removing all tunnels...", total=None)
+
             if active_count > 0:
-                task = progress.add_task(
-                    f"Stopping {active_count} active tunnel(s)...", total=None
+                progress.update(
+                    task, description=f"Stopping {active_count} active tunnel(s)..."
                 )
                 await manager.stop_all_tunnels()
-                progress.update(task, description="Active tunnels stopped")
 
-            task = progress.add_task("Removing all tunnels...", total=None)
+            progress.update(
+                task,
+                description="Removing all tunnels...",
+                completed=0,
+                total=len(tunnels),
+            )
 
-            for tunnel in tunnels:
-                await manager.remove_tunnel(tunnel.config.tunnel_id)
+            failures: list[tuple[TunnelState, TunnelError]] = []
+
+            async def _remove(tunnel: TunnelState) -> None:
+                try:
+                    await manager.remove_tunnel(tunnel.config.tunnel_id)
+                except StorageError:
+                    raise
+                except TunnelError as e:
+                    failures.append((tunnel, e))
+                progress.advance(task)
+
+            # A storage failure aborts the remaining removals instead of
+            # letting them run against a broken backend.
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    for tunnel in tunnels:
+                        tg.create_task(_remove(tunnel))
+            except ExceptionGroup as eg:
+                progress.update(task, description="Cleanup aborted")
+                raise eg.exceptions[0] from eg
 
             progress.update(task, description="All tunnels removed")
 
-            console.print(f"[green]✓[/green] Removed all {len(tunnels)} tunnel(s)")
+            for tunnel, error in failures:
+                console.print(
+                    f"[red]Failed to remove {tunnel.config.tunnel_id[:8]}...: {error}"
+                )
+
+            removed_count = len(tunnels) - len(failures)
+            if failures:
+                console.print(
+                    f"[yellow]Removed {removed_count} of {len(tunnels)} tunnel(s)"
+                )
+            else:
+                console.print(f"[green]✓[/green] Removed all {len(tunnels)} tunnel(s)")
 
     except Exception as e:
         console.print(f"[red]Error during cleanup: {e}")
@@ -11,10 +11,12 @@ import uuid
 from rich.console import Console
 from rich.text import Text
 
-from ... import get_ascii_banner
+from ... import BANNER_LINES
 from ...core.constants import DEFAULT_TUNNEL_NAME, DEFAULT_TUNNEL_PORT
 from ...core.models import TunnelConfig, TunnelProtocol, TunnelStatus
-from ...network.manager import TunnelManager
+from ...network.manager import get_manager
+from ._ui import wait_for_interrupt
+from .logs import stream_logs_async
 
 console = Console()
 
@@ -30,7 +32,7 @@ async def create_tunnel_async(
     logs: bool = True,
 ) -> None:
     """Create and manage a tunnel."""
-    manager = TunnelManager()
+    manager = get_manager()
     tunnel_id = None
 
     try:
@@ -42,32 +44,21 @@ async def create_tunnel_async(
             )
             return
 
-        await manager.load_from_storage()
         existing_tunnels = await manager.list_tunnels()
 
         is_first_tunnel = len(existing_tunnels) == 0
 
         if is_first_tunnel:
             console.print()
-            banner_lines = get_ascii_banner().split("\n")
-            for i, line in enumerate(banner_lines):
-                if i < 6:
-                    console.print(Text(line, style="bold cyan"))
-                elif "Lightning-fast" in line:
-                    console.print(Text(line, style="bold white"))
-                elif "that's anything but crazy" in line:
-                    console.print(Text(line, style="italic white"))
-                elif "VERSION" in line:
-                    console.print(Text(line, style="bold green"))
-                else:
-                    console.print(line)
+            for style, line in BANNER_LINES:
+                console.print(Text(line, style=style))
             console.print()
             console.print(
                 "[bold green]Welcome to loco![/bold green] Let's create your first tunnel."
             )
             console.print()
 
-        tunnel_id = str(uuid.uuid4())
+        tunnel_id = uuid.uuid4().hex
 
         if remote_port is None:
             remote_port = DEFAULT_TUNNEL_PORT + len(existing_tunnels)
@@ -130,31 +121,28 @@ async def create_tunnel_async(
         )
         console.print()
 
-        if start and logs:
+        if start:
             console.print("\n[dim]Press Ctrl+C to stop the tunnel[/dim]")
-            console.print("[dim]" + "=" * 86 + "[/dim]")
 
-            try:
-                from .logs import stream_logs_async
+            async with asyncio.TaskGroup() as tg:
+                log_task = None
+                if logs:
+                    console.print("[dim]" + "=" * 86 + "[/dim]")
+                    log_task = tg.create_task(
+                        stream_logs_async(
+                            tunnel_id, follow=True, header=False, manager=manager
+                        )
+                    )
 
-                await stream_logs_async(
-                    tunnel_id, follow=True, header=False, manager=manager
-                )
-            except KeyboardInterrupt:
-                console.print("\n[bold yellow]Stopping tunnel...")
-                await manager.stop_tunnel(tunnel_id)
-                console.print("[bold green]Tunnel stopped")
-        elif start:
-            console.print("\n[dim]Press Ctrl+C to stop the tunnel[/dim]")
-            try:
-                while True:
-                    await asyncio.sleep(1)
-            except asyncio.CancelledError:
-                pass
-            except KeyboardInterrupt:
-                console.print("\n[bold yellow]Stopping tunnel...")
-                await manager.stop_tunnel(tunnel_id)
-                console.print("[bold green]Tunnel stopped")
+                with contextlib.suppress(KeyboardInterrupt, asyncio.CancelledError):
+                    await wait_for_interrupt()
+
+                if log_task is not None:
+                    log_task.cancel()
+
+            console.print("\n[bold yellow]Stopping tunnel...")
+            await manager.stop_tunnel(tunnel_id)
+            console.print("[bold green]Tunnel stopped")
 
     except Exception as e:
         console.print(f"\n[red]Error creating tunnel - {e}")
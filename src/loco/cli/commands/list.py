@@ -1,7 +1,7 @@
 from rich.console import Console
 from rich.table import Table
 
-from ...network.manager import TunnelManager
+from ...network.manager import get_manager
 
 console = Console()
 
@@ -9,8 +9,7 @@ console = Console()
 async def list_tunnels_async() -> None:
     """List all tunnels."""
     try:
-        manager = TunnelManager()
-        await manager.load_from_storage()
+        manager = get_manager()
 
         tunnels = await manager.list_tunnels()
 
@@ -27,13 +26,14 @@ async def list_tunnels_async() -> None:
         table.add_column("Protocol", style="red")
 
         for tunnel in tunnels:
+            config = tunnel.config
             table.add_row(
-                tunnel.config.tunnel_id[:8] + "...",
-                tunnel.config.name or "—",
+                config.tunnel_id[:8] + "...",
+                config.name or "—",
                 tunnel.status.value,
-                f"{tunnel.config.local_host}:{tunnel.config.local_port}",
+                f"{config.local_host}:{config.local_port}",
                 tunnel.public_url or "—",
-                tunnel.config.protocol.value.upper(),
+                config.protocol.value.upper(),
             )
 
         console.print(table)
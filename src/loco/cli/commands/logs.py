@@ -1,16 +1,67 @@
 """Log streaming for tunnels."""
 
 import asyncio
+import contextlib
+import functools
+import queue
+import threading
 from datetime import datetime
-from typing import Any
+from typing import NamedTuple
 
-from rich.console import Console
+from rich.color import Color, ColorSystem
+from rich.console import COLOR_SYSTEMS, Console
 
 from ...core.exceptions import TunnelNotFoundError
-from ...network.manager import TunnelManager
+from ...core.models import LogEntry
+from ...network.manager import TunnelManager, get_manager
 
 console = Console()
 
+_fromisoformat = datetime.fromisoformat
+
+# Upper bound on buffered log entries; the oldest are dropped once it is hit so
+# a slow terminal cannot grow memory without limit.
+_LOG_QUEUE_SIZE = 1024
+
+# Maximum number of queued entries rendered with a single console write.
+_LOG_BATCH_SIZE = 64
+
+# Upper bound on rendered batches waiting for the writer thread.
+_WRITE_QUEUE_SIZE = 256
+
+_RESET = "\x1b[0m"
+_DIM = "\x1b[2m"
+_WHITE = "\x1b[37m"
+_BLUE = "\x1b[34m"
+
+# Rich colors of the method and status columns, keyed by method and indexed by
+# status class (<=2xx, 3xx, 4xx, >=5xx). They are turned into escape codes for
+# the console's color system by _ansi_palette.
+_METHOD_COLORS = {
+    "GET": "green",
+    "POST": "yellow",
+    "PUT": "blue",
+    "DELETE": "red",
+    "PATCH": "magenta",
+    "OPTIONS": "cyan",
+    "HEAD": "dim",
+}
+_DEFAULT_METHOD_COLOR = "white"
+_STATUS_COLORS = ("green", "yellow", "orange_red1", "red")
+
+# Log rows are written straight to the console file, bypassing Rich markup
+# parsing on the per-request path. Column widths live in the templates so each
+# row is produced by a single %-format call.
+_ANSI_LOG_ROW = (
+    f"{_DIM}%s{_RESET}  "
+    f"%s%-6s{_RESET}  "
+    f"{_WHITE}%-40.40s{_RESET}  "
+    f"%s%3d{_RESET}  "
+    f"{_DIM}%7.2fms{_RESET}  "
+    f"{_BLUE}%s{_RESET}\n"
+)
+_PLAIN_LOG_ROW = "%s  %-6s  %-40.40s  %3d  %7.2fms  %s\n"
+
 
 async def stream_logs_async(
     tunnel_id: str,
@@ -21,8 +72,8 @@ async def stream_logs_async(
     """Stream logs for a tunnel."""
     try:
         if manager is None:
-            manager = TunnelManager()
-            await manager.load_from_storage()
+            manager = get_manager()
+            await manager.ensure_loaded()
 
         tunnel = manager.get_tunnel(tunnel_id)
         tunnel_name = tunnel.config.name or tunnel.config.tunnel_id[:8]
@@ -45,18 +96,40 @@ async def stream_logs_async(
         )
         console.print("[dim]" + "-" * 86 + "[/dim]")
 
-        log_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        log_queue: asyncio.Queue[LogEntry] = asyncio.Queue(maxsize=_LOG_QUEUE_SIZE)
+
+        def _enqueue_log(log: LogEntry) -> None:
+            """Queue a log entry, dropping the oldest one if the queue is full."""
+            try:
+                log_queue.put_nowait(log)
+            except asyncio.QueueFull:
+                log_queue.get_nowait()
+                log_queue.put_nowait(log)
+
+        tunnel.register_log_handler(_enqueue_log)
 
-        if hasattr(tunnel, "register_log_handler"):
-            tunnel.register_log_handler(lambda log: log_queue.put_nowait(log))
+        writer = _LogWriter()
+        writer.start()
+        interrupted = False
 
         try:
             while follow:
-                log_entry = await log_queue.get()
-                _print_log_entry(log_entry)
+                log_entries = [await log_queue.get()]
+                while len(log_entries) < _LOG_BATCH_SIZE and not log_queue.empty():
+                    log_entries.append(log_queue.get_nowait())
+
+                writer.write(_format_log_entries(log_entries))
         except asyncio.CancelledError:
             pass
         except KeyboardInterrupt:
+            interrupted = True
+        finally:
+            tunnel.unregister_log_handler(_enqueue_log)
+            # Joining the writer thread can take up to its timeout, so it is
+            # done off the event loop; the stop message follows the last rows.
+            await asyncio.to_thread(writer.close)
+
+        if interrupted:
             console.print("\n[yellow]Stopped log streaming")
 
     except TunnelNotFoundError:
@@ -65,51 +138,137 @@ async def stream_logs_async(
         console.print(f"[red]Error streaming logs: {e}")
 
 
-def _print_log_entry(entry: dict[Any, Any]) -> None:
-    """Print a formatted log entry."""
-    timestamp = entry.get("timestamp", datetime.now().isoformat())
-    method = entry.get("method", "GET")
-    path = entry.get("path", "/")
-    status = entry.get("status", 200)
-    ip = entry.get("ip", "127.0.0.1")
-    duration = entry.get("duration", 0)
+class _LogWriter:
+    """
+    Background writer for rendered log rows.\n
+    Rows are handed to a daemon thread so that a slow terminal or a full
+    pipe blocks that thread instead of the event loop serving the tunnel.
+    """
 
-    try:
-        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        time_str = dt.strftime("%H:%M:%S")
-    except (ValueError, TypeError):
-        time_str = _get_timestamp()
-
-    if status < 300:
-        status_color = "green"
-    elif status < 400:
-        status_color = "yellow"
-    elif status < 500:
-        status_color = "orange_red1"
+    def __init__(self, maxsize: int = _WRITE_QUEUE_SIZE) -> None:
+        """Initialize the writer and its bounded row queue."""
+        self._rows: queue.Queue[str | None] = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(
+            target=self._run, name="loco-log-writer", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        self._thread.start()
+
+    def write(self, rows: str) -> None:
+        """Queue rows for writing, dropping the oldest batch if the writer is behind."""
+        self._put(rows)
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Flush the queued rows and stop the writer thread."""
+        self._put(None)
+        self._thread.join(timeout)
+
+    def _put(self, rows: str | None) -> None:
+        """Put an item on the queue without blocking the caller."""
+        while True:
+            try:
+                self._rows.put_nowait(rows)
+                return
+            except queue.Full:
+                with contextlib.suppress(queue.Empty):
+                    self._rows.get_nowait()
+
+    def _run(self) -> None:
+        """Write queued rows until the stop sentinel is received."""
+        try:
+            while (rows := self._rows.get()) is not None:
+                console.file.write(rows)
+                console.file.flush()
+        except OSError:
+            # The output pipe was closed (e.g. `loco logs | head`); stop writing.
+            pass
+
+
+class _AnsiPalette(NamedTuple):
+    """Escape codes for the colored columns of a log row."""
+
+    methods: dict[str, str]
+    default_method: str
+    statuses: tuple[str, ...]
+
+
+@functools.cache
+def _ansi_palette(color_system: ColorSystem) -> _AnsiPalette:
+    """Build the log row escape codes that a color system can display."""
+
+    def sgr(color: str) -> str:
+        if color == "dim":
+            return _DIM
+        codes = Color.parse(color).downgrade(color_system).get_ansi_codes()
+        return f"\x1b[{';'.join(codes)}m"
+
+    return _AnsiPalette(
+        methods={method: sgr(color) for method, color in _METHOD_COLORS.items()},
+        default_method=sgr(_DEFAULT_METHOD_COLOR),
+        statuses=tuple(sgr(color) for color in _STATUS_COLORS),
+    )
+
+
+def _format_log_entries(entries: list[LogEntry]) -> str:
+    """Format a batch of log entries as terminal rows."""
+    color_system = console.color_system
+    # Legacy Windows consoles only color through the console API, so escape
+    # codes written straight to the file would show up as text.
+    if color_system is None or console.legacy_windows:
+        palette = None
     else:
-        status_color = "red"
-
-    method_colors = {
-        "GET": "green",
-        "POST": "yellow",
-        "PUT": "blue",
-        "DELETE": "red",
-        "PATCH": "magenta",
-        "OPTIONS": "cyan",
-        "HEAD": "dim",
-    }
-    method_color = method_colors.get(method, "white")
-
-    console.print(
-        f"[dim]{time_str}[/dim]  "
-        f"[{method_color}]{method:6}[/{method_color}]  "
-        f"[white]{path:40.40}[/white]  "
-        f"[{status_color}]{status:3}[/{status_color}]  "
-        f"[dim]{duration:7.2f}ms[/dim]  "
-        f"[blue]{ip}[/blue]"
+        palette = _ansi_palette(COLOR_SYSTEMS[color_system])
+    return "".join([_format_log_entry(entry, palette) for entry in entries])
+
+
+def _format_log_entry(entry: LogEntry, palette: _AnsiPalette | None) -> str:
+    """Format a log entry as a single terminal row."""
+    time_str = (
+        _format_log_time(entry.timestamp) if entry.timestamp else _get_timestamp()
+    )
+
+    if palette is None:
+        return _PLAIN_LOG_ROW % (
+            time_str,
+            entry.method,
+            entry.path,
+            entry.status,
+            entry.duration,
+            entry.ip,
+        )
+
+    return _ANSI_LOG_ROW % (
+        time_str,
+        palette.methods.get(entry.method, palette.default_method),
+        entry.method,
+        entry.path,
+        palette.statuses[min(max(entry.status // 100 - 2, 0), 3)],
+        entry.status,
+        entry.duration,
+        entry.ip,
     )
 
 
+def _format_log_time(timestamp: str) -> str:
+    """Extract the HH:MM:SS portion of an ISO-8601 log timestamp."""
+    # Rows emitted by the tunnel server carry a full "YYYY-MM-DDTHH:MM:SS..."
+    # timestamp, so the time can be sliced out without parsing.
+    try:
+        if (
+            len(timestamp) >= 19
+            and timestamp[10] == "T"
+            and timestamp[13] == ":"
+            and timestamp[16] == ":"
+        ):
+            return timestamp[11:19]
+
+        return _fromisoformat(timestamp).strftime("%H:%M:%S")
+    except (ValueError, TypeError):
+        return _get_timestamp()
+
+
 def _get_timestamp() -> str:
     """Get current timestamp for logs."""
     return datetime.now().strftime("%H:%M:%S")
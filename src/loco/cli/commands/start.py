@@ -1,10 +1,12 @@
 import asyncio
+import contextlib
 
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ...core.exceptions import TunnelNotFoundError
-from ...network.manager import TunnelManager
+from ...core.models import ACTIVE_STATUSES
+from ...network.manager import get_manager
+from ._ui import make_progress, wait_for_interrupt
 
 console = Console()
 
@@ -12,21 +14,11 @@ console = Console()
 async def start_tunnel_async(tunnel_id: str) -> None:
     """Start a tunnel."""
     try:
-        manager = TunnelManager()
-        await manager.load_from_storage()
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            tunnels = await manager.list_tunnels()
-            matching_tunnels = [
-                t
-                for t in tunnels
-                if t.config.tunnel_id.startswith(tunnel_id)
-                or (t.config.name and tunnel_id.lower() in t.config.name.lower())
-            ]
+        manager = get_manager()
+
+        with make_progress(console) as progress:
+            await manager.ensure_loaded()
+            matching_tunnels = manager.find_by_prefix(tunnel_id)
 
             if not matching_tunnels:
                 console.print(f"[red]Error: No tunnel found matching '{tunnel_id}'")
@@ -43,7 +35,7 @@ async def start_tunnel_async(tunnel_id: str) -> None:
             tunnel = matching_tunnels[0]
             full_tunnel_id = tunnel.config.tunnel_id
 
-            if tunnel.status.value in ["active", "starting"]:
+            if tunnel.status in ACTIVE_STATUSES:
                 console.print(
                     f"[yellow]Tunnel {full_tunnel_id[:8]}... is already running"
                 )
@@ -75,16 +67,12 @@ async def start_tunnel_async(tunnel_id: str) -> None:
             console.print("[dim]Press Ctrl+C to stop the tunnel[/dim]")
             console.print("[dim]" + "=" * 80 + "[/dim]")
 
-            try:
-                while True:
-                    await asyncio.sleep(1)
-            except KeyboardInterrupt:
-                console.print("\n[bold yellow]Stopping tunnel...")
-                await manager.stop_tunnel(full_tunnel_id)
+            with contextlib.suppress(KeyboardInterrupt, asyncio.CancelledError):
+                await wait_for_interrupt()
 
-                tunnel_instance = manager.get_tunnel(full_tunnel_id)
-                await manager.storage.save_tunnel_state(tunnel_instance.state)
-                console.print("[bold green]Tunnel stopped")
+            console.print("\n[bold yellow]Stopping tunnel...")
+            await manager.stop_tunnel(full_tunnel_id)
+            console.print("[bold green]Tunnel stopped")
 
         except TunnelNotFoundError:
             console.print(f"[red]Error: Tunnel {tunnel_id} not found")
@@ -1,10 +1,12 @@
+from functools import lru_cache
+
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
 from ...core.models import TunnelStatus
-from ...network.manager import TunnelManager
+from ...network.manager import TunnelManager, get_manager
 
 console = Console()
 
@@ -12,8 +14,8 @@ console = Console()
 async def status_tunnel_async(tunnel_id: str | None = None) -> None:
     """Show tunnel status."""
     try:
-        manager = TunnelManager()
-        await manager.load_from_storage()
+        manager = get_manager()
+        await manager.ensure_loaded()
 
         if tunnel_id:
             await _show_tunnel_details(manager, tunnel_id)
@@ -27,13 +29,8 @@ async def status_tunnel_async(tunnel_id: str | None = None) -> None:
 async def _show_tunnel_details(manager: TunnelManager, tunnel_id: str) -> None:
     """Show detailed status for a specific tunnel."""
     try:
-        tunnels = await manager.list_tunnels()
-        matching_tunnels = [
-            t
-            for t in tunnels
-            if t.config.tunnel_id.startswith(tunnel_id)
-            or (t.config.name and tunnel_id.lower() in t.config.name.lower())
-        ]
+        await manager.ensure_loaded()
+        matching_tunnels = manager.find_by_prefix(tunnel_id)
 
         if not matching_tunnels:
             console.print(f"[red]Error: No tunnel found matching '{tunnel_id}'")
@@ -116,26 +113,28 @@ async def _show_tunnels_overview(manager: TunnelManager) -> None:
     table.add_column("Uptime", style="white")
     table.add_column("Connections", style="cyan")
 
+    stats_by_id = manager.get_many_stats(
+        [t.config.tunnel_id for t in tunnels if t.status == TunnelStatus.ACTIVE]
+    )
+
     for tunnel in tunnels:
+        config = tunnel.config
+        status_value = tunnel.status.value
         uptime = "—"
         connections = "—"
 
-        if tunnel.status == TunnelStatus.ACTIVE:
-            try:
-                stats = await manager.get_tunnel_stats(tunnel.config.tunnel_id)
-                uptime = _format_uptime(stats["uptime_seconds"])
-                connections = str(stats["active_connections"])
-            except Exception:
-                pass
+        stats = stats_by_id.get(config.tunnel_id)
+        if stats is not None:
+            uptime = _format_uptime(stats["uptime_seconds"])
+            connections = str(stats["active_connections"])
 
-        status_color = _get_status_color(tunnel.status.value)
-        status_text = Text(tunnel.status.value, style=status_color)
+        status_text = Text(status_value, style=_get_status_color(status_value))
 
         table.add_row(
-            tunnel.config.tunnel_id[:8] + "...",
-            tunnel.config.name or "—",
+            config.tunnel_id[:8] + "...",
+            config.name or "—",
             status_text,
-            f"{tunnel.config.local_host}:{tunnel.config.local_port}",
+            f"{config.local_host}:{config.local_port}",
             tunnel.public_url or "—",
             uptime,
             connections,
@@ -151,6 +150,7 @@ async def _show_tunnels_overview(manager: TunnelManager) -> None:
     console.print(f"\n[bold]Summary:[/bold] {' | '.join(summary_text)}")
 
 
+@lru_cache(maxsize=16)
 def _get_status_color(status: str) -> str:
     """Get color for tunnel status."""
     colors = {
@@ -175,16 +175,16 @@ def _format_uptime(seconds: float) -> str:
         return f"{hours}h {minutes}m"
 
 
+_BYTE_UNITS = ("B", "KB", "MB", "GB")
+
+
 def _format_bytes(bytes_count: int) -> str:
     """Format bytes in human readable format."""
-    if bytes_count < 1024:
+    # Each unit step is 2**10, so the bit length picks the unit directly.
+    unit = min(max((bytes_count.bit_length() - 1) // 10, 0), len(_BYTE_UNITS) - 1)
+    if unit == 0:
         return f"{bytes_count} B"
-    elif bytes_count < 1024 * 1024:
-        return f"{bytes_count / 1024:.1f} KB"
-    elif bytes_count < 1024 * 1024 * 1024:
-        return f"{bytes_count / (1024 * 1024):.1f} MB"
-    else:
-        return f"{bytes_count / (1024 * 1024 * 1024):.1f} GB"
+    return f"{bytes_count / (1 << (10 * unit)):.1f} {_BYTE_UNITS[unit]}"
 
 
 def _format_timestamp(timestamp_str: str) -> str:
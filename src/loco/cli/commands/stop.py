@@ -1,8 +1,9 @@
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ...core.exceptions import TunnelNotFoundError
-from ...network.manager import TunnelManager
+from ...core.models import ACTIVE_STATUSES, STOPPED_STATUSES
+from ...network.manager import get_manager
+from ._ui import make_progress
 
 console = Console()
 
@@ -10,21 +11,11 @@ console = Console()
 async def stop_tunnel_async(tunnel_id: str) -> None:
     """Stop a tunnel."""
     try:
-        manager = TunnelManager()
-        await manager.load_from_storage()
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            tunnels = await manager.list_tunnels()
-            matching_tunnels = [
-                t
-                for t in tunnels
-                if t.config.tunnel_id.startswith(tunnel_id)
-                or (t.config.name and tunnel_id.lower() in t.config.name.lower())
-            ]
+        manager = get_manager()
+
+        with make_progress(console) as progress:
+            await manager.ensure_loaded()
+            matching_tunnels = manager.find_by_prefix(tunnel_id)
 
             if not matching_tunnels:
                 console.print(f"[red]Error: No tunnel found matching '{tunnel_id}'")
@@ -41,7 +32,7 @@ async def stop_tunnel_async(tunnel_id: str) -> None:
             tunnel = matching_tunnels[0]
             full_tunnel_id = tunnel.config.tunnel_id
 
-            if tunnel.status.value in ["stopped", "error"]:
+            if tunnel.status in STOPPED_STATUSES:
                 console.print(
                     f"[yellow]Tunnel {full_tunnel_id[:8]}... is already stopped"
                 )
@@ -70,23 +61,16 @@ async def stop_tunnel_async(tunnel_id: str) -> None:
 async def stop_all_tunnels_async() -> None:
     """Stop all active tunnels."""
     try:
-        manager = TunnelManager()
-        await manager.load_from_storage()
+        manager = get_manager()
 
         tunnels = await manager.list_tunnels()
-        active_tunnels = [
-            t for t in tunnels if t.status.value in ["active", "starting"]
-        ]
+        active_tunnels = [t for t in tunnels if t.status in ACTIVE_STATUSES]
 
         if not active_tunnels:
             console.print("[yellow]No active tunnels to stop")
             return
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
+        with make_progress(console) as progress:
             task = progress.add_task(
                 f"Stopping {len(active_tunnels)} tunnel(s)...", total=None
             )
@@ -2,14 +2,16 @@
 
 import asyncio
 import logging
+from collections.abc import Callable, Coroutine
+from typing import Any
 
 import typer
 from rich.console import Console
 from rich.text import Text
 
-from .. import get_ascii_banner
+from .. import BANNER_LINES, get_ascii_banner
+from ..core.constants import DEFAULT_STORAGE_BACKEND, STORAGE_BACKENDS
 from ..utils.logging import setup_logging
-from .commands import cleanup, create, list, logs, start, status, stop
 
 app = typer.Typer(
     name="loco",
@@ -20,6 +22,28 @@ app = typer.Typer(
 
 console = Console()
 
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and not available on Windows
+    _loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = None
+else:
+    _loop_factory = uvloop.new_event_loop
+
+
+def _run(coro: Coroutine[Any, Any, None]) -> None:
+    """Run a command coroutine, on uvloop when it is installed."""
+    asyncio.run(_run_and_close(coro), loop_factory=_loop_factory)
+
+
+async def _run_and_close(coro: Coroutine[Any, Any, None]) -> None:
+    """Run a command coroutine, then release the tunnel manager's storage."""
+    from ..network.manager import close_manager
+
+    try:
+        await coro
+    finally:
+        await close_manager()
+
 
 @app.command("create")
 def create_tunnel(
@@ -43,7 +67,9 @@ def create_tunnel(
     ),
 ) -> None:
     """Create a new tunnel."""
-    asyncio.run(
+    from .commands import create
+
+    _run(
         create.create_tunnel_async(
             port=port,
             name=name,
@@ -60,7 +86,9 @@ def create_tunnel(
 @app.command("list")
 def list_tunnels() -> None:
     """List all tunnels."""
-    asyncio.run(list.list_tunnels_async())
+    from .commands import list
+
+    _run(list.list_tunnels_async())
 
 
 @app.command("start")
@@ -68,19 +96,25 @@ def start_tunnel(
     tunnel_id: str = typer.Argument(..., help="Tunnel ID to start"),
 ) -> None:
     """Start a stopped tunnel."""
-    asyncio.run(start.start_tunnel_async(tunnel_id))
+    from .commands import start
+
+    _run(start.start_tunnel_async(tunnel_id))
 
 
 @app.command("stop")
 def stop_tunnel(tunnel_id: str = typer.Argument(..., help="Tunnel ID to stop")) -> None:
     """Stop a tunnel."""
-    asyncio.run(stop.stop_tunnel_async(tunnel_id))
+    from .commands import stop
+
+    _run(stop.stop_tunnel_async(tunnel_id))
 
 
 @app.command("stop-all")
 def stop_all_tunnels() -> None:
     """Stop all active tunnels."""
-    asyncio.run(stop.stop_all_tunnels_async())
+    from .commands import stop
+
+    _run(stop.stop_all_tunnels_async())
 
 
 @app.command("status")
@@ -88,7 +122,9 @@ def status_tunnel(
     tunnel_id: str | None = typer.Argument(None, help="Tunnel ID (optional)"),
 ) -> None:
     """Show tunnel status."""
-    asyncio.run(status.status_tunnel_async(tunnel_id))
+    from .commands import status
+
+    _run(status.status_tunnel_async(tunnel_id))
 
 
 @app.command("cleanup")
@@ -96,7 +132,9 @@ def cleanup_tunnels(
     force: bool = typer.Option(False, "--force", "-f", help="Skip confirmation"),
 ) -> None:
     """Clean up stopped tunnels."""
-    asyncio.run(cleanup.cleanup_tunnels_async(force))
+    from .commands import cleanup
+
+    _run(cleanup.cleanup_tunnels_async(force))
 
 
 @app.command("cleanup-all")
@@ -104,7 +142,9 @@ def cleanup_all_tunnels(
     force: bool = typer.Option(False, "--force", "-f", help="Skip confirmation"),
 ) -> None:
     """Clean up all tunnels (including active ones)."""
-    asyncio.run(cleanup.cleanup_all_async(force))
+    from .commands import cleanup
+
+    _run(cleanup.cleanup_all_async(force))
 
 
 @app.command("logs")
@@ -115,7 +155,9 @@ def logs_tunnel(
     ),
 ) -> None:
     """Stream logs for a tunnel."""
-    asyncio.run(logs.stream_logs_async(tunnel_id, follow))
+    from .commands import logs
+
+    _run(logs.stream_logs_async(tunnel_id, follow))
 
 
 @app.callback(invoke_without_command=True)
@@ -126,6 +168,12 @@ def main(
     ),
     verbose: bool = typer.Option(False, "--verbose", help="Enable verbose logging"),
     debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+    storage: str = typer.Option(
+        DEFAULT_STORAGE_BACKEND,
+        "--storage",
+        envvar="LOCO_STORAGE",
+        help="Storage backend (file/sqlite)",
+    ),
 ) -> None:
     """Lightning-fast localhost tunneling that's anything but crazy."""
 
@@ -137,22 +185,21 @@ def main(
         setup_logging(logging.CRITICAL + 1)
 
     if version:
-        banner_lines = get_ascii_banner().split("\n")
-
-        for i, line in enumerate(banner_lines):
-            if i < 6:  # ASCII art lines
-                console.print(Text(line, style="bold cyan"))
-            elif "Lightning-fast" in line:
-                console.print(Text(line, style="bold white"))
-            elif "that's anything but crazy" in line:
-                console.print(Text(line, style="italic white"))
-            elif "VERSION" in line:
-                console.print(Text(line, style="bold green"))
-            else:
-                console.print(line)
+        for style, line in BANNER_LINES:
+            console.print(Text(line, style=style))
 
         raise typer.Exit()
 
+    if storage not in STORAGE_BACKENDS:
+        raise typer.BadParameter(
+            f"must be one of: {', '.join(STORAGE_BACKENDS)}", param_hint="--storage"
+        )
+
+    if ctx.invoked_subcommand is not None:
+        from ..network.manager import set_storage_backend
+
+        set_storage_backend(storage)
+
     if ctx.invoked_subcommand is None:
         console.print(Text(get_ascii_banner(), style="bold cyan"))
         console.print("\n[bold]Available commands:[/bold]")
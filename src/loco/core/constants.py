@@ -1,2 +1,4 @@
 DEFAULT_TUNNEL_PORT = 6000
 DEFAULT_TUNNEL_NAME = "loco-tunnel-{port}"
+STORAGE_BACKENDS = ("file", "sqlite")
+DEFAULT_STORAGE_BACKEND = "file"
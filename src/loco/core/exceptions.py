@@ -4,28 +4,28 @@
 class TunnelError(Exception):
     """Base exception for tunnel-related errors."""
 
-    pass
+    __slots__ = ()
 
 
 class TunnelNotFoundError(TunnelError):
     """Raised when a tunnel is not found."""
 
-    pass
+    __slots__ = ()
 
 
 class TunnelStartupError(TunnelError):
     """Raised when a tunnel fails to start."""
 
-    pass
+    __slots__ = ()
 
 
 class TunnelConfigError(TunnelError):
     """Raised when tunnel configuration is invalid."""
 
-    pass
+    __slots__ = ()
 
 
 class StorageError(TunnelError):
     """Raised when storage operations fail."""
 
-    pass
+    __slots__ = ()
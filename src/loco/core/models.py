@@ -6,9 +6,13 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import StrEnum
+from typing import TYPE_CHECKING, NamedTuple, Protocol
 
 from pydantic import BaseModel, ConfigDict, Field, PositiveFloat, PositiveInt
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 
 class TunnelStatus(StrEnum):
     """
@@ -28,6 +32,12 @@ class TunnelStatus(StrEnum):
     STOPPING = "stopping"
 
 
+# Statuses of a tunnel that is running or coming up, and of one that has
+# finished, either cleanly or with an error.
+ACTIVE_STATUSES = frozenset({TunnelStatus.STARTING, TunnelStatus.ACTIVE})
+STOPPED_STATUSES = frozenset({TunnelStatus.STOPPED, TunnelStatus.ERROR})
+
+
 class TunnelProtocol(StrEnum):
     """
     Enumeration of supported tunnel protocols.
@@ -65,9 +75,8 @@ class TunnelConfig(BaseModel):
         tags (list[str]): Tags for organization (default: empty list).
     """
 
-    model_config = ConfigDict(
-        str_strip_whitespace=True, validate_assignment=True, extra="forbid"
-    )
+    # Configs are never changed in place; variants are built with model_copy.
+    model_config = ConfigDict(str_strip_whitespace=True, frozen=True, extra="forbid")
 
     tunnel_id: str = Field(..., description="Unique identifier for the tunnel")
     name: str | None = Field(None, description="Human-readable name for the tunnel")
@@ -91,7 +100,7 @@ class TunnelConfig(BaseModel):
         default=8192, description="Buffer size for data transfer"
     )
     created_at: datetime | None = Field(
-        default_factory=lambda: datetime.now(), description="Creation timestamp"
+        default_factory=datetime.now, description="Creation timestamp"
     )
     tags: list[str] = Field(default_factory=list, description="Tags for organization")
 
@@ -113,14 +122,16 @@ class TunnelState(BaseModel):
         bytes_transferred (int): Total bytes transferred through the tunnel.
     """
 
-    model_config = ConfigDict(validate_assignment=True, extra="forbid")
+    # Assignments are not validated: the tunnel updates these counters and
+    # timestamps on every connection, and fields are validated on load.
+    model_config = ConfigDict(extra="forbid")
 
     config: TunnelConfig = Field(..., description="Tunnel configuration")
     status: TunnelStatus = Field(
         default=TunnelStatus.STOPPED, description="Current tunnel status"
     )
     created_at: datetime | None = Field(
-        default_factory=lambda: datetime.now(), description="Creation timestamp"
+        default_factory=datetime.now, description="Creation timestamp"
     )
     started_at: datetime | None = Field(None, description="Start timestamp")
     stopped_at: datetime | None = Field(None, description="Stop timestamp")
@@ -147,7 +158,7 @@ class ConnectionInfo(BaseModel):
 
     remote_addr: str = Field(..., description="Remote address")
     timestamp: datetime = Field(
-        default_factory=lambda: datetime.now(), description="Connection timestamp"
+        default_factory=datetime.now, description="Connection timestamp"
     )
     method: str | None = Field(None, description="HTTP method")
     path: str | None = Field(None, description="Request path")
@@ -174,3 +185,41 @@ class TunnelStats(BaseModel):
     )
     error_rate: float = Field(default=0.0, description="Error rate percentage")
     bandwidth_usage: int = Field(default=0, description="Bandwidth usage in bytes")
+
+
+class LogEntry(NamedTuple):
+    """
+    A request log record emitted by a tunnel.
+    Attributes:
+        tunnel_id (str): Identifier of the tunnel that served the request.
+        timestamp (str): ISO-8601 timestamp of the request.
+        method (str): HTTP method of the request.
+        path (str): Request path.
+        status (int): Response status code.
+        ip (str | None): Remote address of the client.
+        duration (float): Time taken to serve the request in milliseconds.
+        query_string (str): Raw query string of the request.
+        headers (dict[str, str]): Request headers.
+    """
+
+    tunnel_id: str
+    timestamp: str
+    method: str
+    path: str
+    status: int
+    ip: str | None
+    duration: float
+    query_string: str
+    headers: dict[str, str]
+
+
+class LogStreamable(Protocol):
+    """Interface for objects that publish request logs to registered handlers."""
+
+    def register_log_handler(self, handler: Callable[[LogEntry], None]) -> None:
+        """Register a log handler function."""
+        ...
+
+    def unregister_log_handler(self, handler: Callable[[LogEntry], None]) -> None:
+        """Unregister a log handler function."""
+        ...
@@ -5,9 +5,17 @@ from __future__ import annotations
 import asyncio
 from typing import TYPE_CHECKING, Any
 
+from ..core.constants import DEFAULT_STORAGE_BACKEND
 from ..core.exceptions import TunnelError, TunnelNotFoundError
-from ..core.models import TunnelConfig, TunnelState, TunnelStatus
+from ..core.models import (
+    ACTIVE_STATUSES,
+    STOPPED_STATUSES,
+    TunnelConfig,
+    TunnelState,
+    TunnelStatus,
+)
 from ..storage.file_storage import FileStorage
+from ..storage.sqlite_storage import SqliteStorage
 from ..utils.logging import get_logger
 from .tunnel import Tunnel
 
@@ -31,14 +39,17 @@ class TunnelManager:
         """Initialize tunnel manager."""
         self.storage = storage or FileStorage()
         self._tunnels: dict[str, Tunnel] = {}
+        # Lower-cased names of named tunnels, filled as tunnels are added so
+        # name matching does not lower every name on each lookup.
+        self._names_lower: dict[str, str] = {}
+        self._load_task: asyncio.Task[None] | None = None
 
     async def create_tunnel(self, config: TunnelConfig) -> str:
         """Create a new tunnel."""
         if config.tunnel_id in self._tunnels:
             raise TunnelError(f"Tunnel {config.tunnel_id} already exists")
 
-        tunnel = Tunnel(config)
-        self._tunnels[config.tunnel_id] = tunnel
+        tunnel = self._add_tunnel(config)
 
         await self.storage.save_tunnel_config(config)
         await self.storage.save_tunnel_state(tunnel.state)
@@ -68,15 +79,27 @@ class TunnelManager:
         if tunnel.is_active():
             await tunnel.stop()
         del self._tunnels[full_tunnel_id]
+        self._names_lower.pop(full_tunnel_id, None)
 
         await self.storage.delete_tunnel(full_tunnel_id)
 
         logger.info(f"Removed tunnel {full_tunnel_id}")
 
     async def list_tunnels(self) -> list[TunnelState]:
-        """List all tunnels."""
-        for tunnel_id in self._tunnels:
-            await self.sync_tunnel_state(tunnel_id)
+        """
+        List all tunnels, loading them from storage on first use.\n
+        Only tunnels that are running or whose status may be stale are synced
+        back to storage; settled, inactive tunnels have nothing to write.
+        """
+        await self.ensure_loaded()
+
+        await asyncio.gather(
+            *(
+                self.sync_tunnel_state(tunnel_id)
+                for tunnel_id, tunnel in self._tunnels.items()
+                if tunnel.is_active() or tunnel.state.status not in STOPPED_STATUSES
+            )
+        )
 
         return [tunnel.state for tunnel in self._tunnels.values()]
 
@@ -90,18 +113,53 @@ class TunnelManager:
         tunnel = self._get_tunnel_by_partial_id(tunnel_id)
         return tunnel.get_stats()
 
-    async def cleanup_stopped_tunnels(self) -> int:
-        """Clean up stopped tunnels."""
-        stopped_count = 0
-        tunnel_ids_to_remove = []
+    def get_many_stats(self, tunnel_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Get statistics for several tunnels by full ID in a single pass.\n
+        IDs are looked up directly without partial matching, and unknown IDs
+        are left out of the result.
+        """
+        stats: dict[str, dict[str, Any]] = {}
+        for tunnel_id in tunnel_ids:
+            tunnel = self._tunnels.get(tunnel_id)
+            if tunnel is not None:
+                stats[tunnel_id] = tunnel.get_stats()
+        return stats
+
+    async def cleanup_stopped_tunnels(self, tunnel_ids: list[str] | None = None) -> int:
+        """
+        Clean up stopped tunnels.\n
+        Callers that have already selected the tunnels to remove can pass
+        their IDs to skip re-scanning. Removals run concurrently and the
+        number of tunnels removed is returned. If any removal fails, a
+        TunnelError naming each failed tunnel is raised once all have run.
+        """
+        if tunnel_ids is None:
+            tunnel_ids = [
+                tunnel_id
+                for tunnel_id, tunnel in self._tunnels.items()
+                if tunnel.state.status == TunnelStatus.STOPPED
+            ]
+
+        results = await asyncio.gather(
+            *(self.remove_tunnel(tunnel_id) for tunnel_id in tunnel_ids),
+            return_exceptions=True,
+        )
 
-        for tunnel_id, tunnel in self._tunnels.items():
-            if tunnel.state.status == TunnelStatus.STOPPED:
-                tunnel_ids_to_remove.append(tunnel_id)
+        failures: list[tuple[str, Exception]] = []
+        for tunnel_id, result in zip(tunnel_ids, results, strict=True):
+            if isinstance(result, Exception):
+                failures.append((tunnel_id, result))
+            elif isinstance(result, BaseException):
+                raise result
 
-        for tunnel_id in tunnel_ids_to_remove:
-            await self.remove_tunnel(tunnel_id)
-            stopped_count += 1
+        stopped_count = len(tunnel_ids) - len(failures)
+        if failures:
+            details = "; ".join(f"{tid}: {error}" for tid, error in failures)
+            raise TunnelError(
+                f"Cleaned up {stopped_count} of {len(tunnel_ids)} tunnel(s), "
+                f"failed to remove {details}"
+            ) from failures[0][1]
 
         return stopped_count
 
@@ -115,50 +173,73 @@ class TunnelManager:
         if len(tasks) > 0:
             await asyncio.gather(*tasks, return_exceptions=True)
 
+    async def ensure_loaded(self) -> None:
+        """
+        Load tunnels from storage once.\n
+        Concurrent callers share the same in-flight load, and later callers
+        return immediately once it has completed. A failed load is not cached
+        so that the next call retries it.
+        """
+        if self._load_task is None:
+            self._load_task = asyncio.ensure_future(self.load_from_storage())
+
+        try:
+            await self._load_task
+        except Exception:
+            self._load_task = None
+            raise
+
     async def load_from_storage(self) -> None:
-        """Load tunnels from storage."""
+        """
+        Load tunnels from storage.\n
+        States are read concurrently, and any states that need repairing
+        (missing, or left running by a previous process) are written back
+        concurrently once every tunnel has been installed.
+        """
         configs = await self.storage.list_tunnel_configs()
+        states = await asyncio.gather(
+            *(self.storage.load_tunnel_state(c.tunnel_id) for c in configs),
+            return_exceptions=True,
+        )
 
-        for config in configs:
-            if config.tunnel_id not in self._tunnels:
-                tunnel = Tunnel(config)
-                self._tunnels[config.tunnel_id] = tunnel
-
-                try:
-                    state = await self.storage.load_tunnel_state(config.tunnel_id)
-                    if state:
-                        tunnel.state = state
-                        if tunnel.state.status in [
-                            TunnelStatus.ACTIVE,
-                            TunnelStatus.STARTING,
-                        ]:
-                            tunnel.state.status = TunnelStatus.STOPPED
-                            await self.storage.save_tunnel_state(tunnel.state)
-                    else:
-                        await self.storage.save_tunnel_state(tunnel.state)
-                except Exception as e:
-                    logger.warning(
-                        f"Could not load state for tunnel {config.tunnel_id}: {e}"
-                    )
-            else:
-                try:
-                    state = await self.storage.load_tunnel_state(config.tunnel_id)
-                    if state:
-                        existing_tunnel = self._tunnels[config.tunnel_id]
-                        if not existing_tunnel.is_active():
-                            existing_tunnel.state = state
-                            if existing_tunnel.state.status in [
-                                TunnelStatus.ACTIVE,
-                                TunnelStatus.STARTING,
-                            ]:
-                                existing_tunnel.state.status = TunnelStatus.STOPPED
-                                await self.storage.save_tunnel_state(
-                                    existing_tunnel.state
-                                )
-                except Exception as e:
-                    logger.warning(
-                        f"Could not update state for tunnel {config.tunnel_id}: {e}"
-                    )
+        pending: list[TunnelState] = []
+        for config, state in zip(configs, states, strict=True):
+            tunnel = self._tunnels.get(config.tunnel_id)
+            is_new = tunnel is None
+            if tunnel is None:
+                tunnel = self._add_tunnel(config)
+
+            if isinstance(state, BaseException):
+                action = "load" if is_new else "update"
+                logger.warning(
+                    f"Could not {action} state for tunnel {config.tunnel_id}: {state}"
+                )
+                continue
+
+            if state is None:
+                if is_new:
+                    pending.append(tunnel.state)
+                continue
+
+            if is_new or not tunnel.is_active():
+                # Share the config validated from the configs directory rather
+                # than keeping the duplicate nested in the state file.
+                state.config = tunnel.config
+                tunnel.state = state
+                if state.status in ACTIVE_STATUSES:
+                    state.status = TunnelStatus.STOPPED
+                    pending.append(state)
+
+        results = await asyncio.gather(
+            *(self.storage.save_tunnel_state(state) for state in pending),
+            return_exceptions=True,
+        )
+        for state, result in zip(pending, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    f"Could not save state for tunnel {state.config.tunnel_id}: "
+                    f"{result}"
+                )
 
     async def sync_tunnel_state(self, tunnel_id: str) -> None:
         """Synchronize tunnel state with storage."""
@@ -166,10 +247,7 @@ class TunnelManager:
 
         if tunnel.is_active() and tunnel.state.status != TunnelStatus.ACTIVE:
             tunnel.state.status = TunnelStatus.ACTIVE
-        elif not tunnel.is_active() and tunnel.state.status not in [
-            TunnelStatus.STOPPED,
-            TunnelStatus.ERROR,
-        ]:
+        elif not tunnel.is_active() and tunnel.state.status not in STOPPED_STATUSES:
             tunnel.state.status = TunnelStatus.STOPPED
 
         await self.storage.save_tunnel_state(tunnel.state)
@@ -177,6 +255,14 @@ class TunnelManager:
             f"Synchronized state for tunnel {tunnel_id}: {tunnel.state.status}"
         )
 
+    def _add_tunnel(self, config: TunnelConfig) -> Tunnel:
+        """Register a new tunnel for a config and index its name."""
+        tunnel = Tunnel(config)
+        self._tunnels[config.tunnel_id] = tunnel
+        if config.name:
+            self._names_lower[config.tunnel_id] = config.name.lower()
+        return tunnel
+
     def _get_tunnel(self, tunnel_id: str) -> Tunnel:
         """Get tunnel by exact ID or raise exception."""
         if tunnel_id not in self._tunnels:
@@ -188,12 +274,7 @@ class TunnelManager:
         if tunnel_id in self._tunnels:
             return self._tunnels[tunnel_id]
 
-        matching_tunnels: list[Tunnel] = []
-        for full_id, tunnel in self._tunnels.items():
-            if full_id.startswith(tunnel_id) or (
-                tunnel.config.name and tunnel_id.lower() in tunnel.config.name.lower()
-            ):
-                matching_tunnels.append(tunnel)
+        matching_tunnels = self._match_tunnels(tunnel_id)
 
         if not matching_tunnels:
             raise TunnelNotFoundError(f"No tunnel found matching '{tunnel_id}'")
@@ -211,6 +292,53 @@ class TunnelManager:
 
         return matching_tunnels[0]
 
+    def _match_tunnels(self, query: str) -> list[Tunnel]:
+        """Get tunnels whose ID starts with query or whose name contains it."""
+        query_lower = query.lower()
+        names_lower = self._names_lower
+        return [
+            tunnel
+            for tunnel_id, tunnel in self._tunnels.items()
+            if tunnel_id.startswith(query)
+            or query_lower in names_lower.get(tunnel_id, "")
+        ]
+
+    def find_by_prefix(self, query: str) -> list[TunnelState]:
+        """Get the states of tunnels matching an ID prefix or name."""
+        return [tunnel.state for tunnel in self._match_tunnels(query)]
+
     def get_tunnel(self, tunnel_id: str) -> Tunnel:
         """Public method to get tunnel by ID or partial ID."""
         return self._get_tunnel_by_partial_id(tunnel_id)
+
+
+_manager: TunnelManager | None = None
+_storage_backend = DEFAULT_STORAGE_BACKEND
+
+
+def set_storage_backend(backend: str) -> None:
+    """
+    Choose the storage backend of the process-wide tunnel manager.\n
+    Takes effect only when called before the manager is first created.
+    """
+    global _storage_backend  # noqa: PLW0603
+    _storage_backend = backend
+
+
+def get_manager() -> TunnelManager:
+    """
+    Get the process-wide tunnel manager.\n
+    The manager is created on first use and shared by every caller so that
+    tunnel state is only loaded from storage once per process.
+    """
+    global _manager  # noqa: PLW0603
+    if _manager is None:
+        storage = SqliteStorage() if _storage_backend == "sqlite" else FileStorage()
+        _manager = TunnelManager(storage)
+    return _manager
+
+
+async def close_manager() -> None:
+    """Release the storage of the process-wide tunnel manager, if it exists."""
+    if _manager is not None:
+        await _manager.storage.close()
@@ -5,7 +5,7 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import socket
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, cast
 
 from ..core.exceptions import TunnelError
 from ..utils.logging import get_logger
@@ -18,6 +18,9 @@ if TYPE_CHECKING:
 
 logger = get_logger("loco.network.proxy")
 
+# Smaller receive buffers make bulk transfers pay for many more reads.
+_MIN_PIPE_BUFFER_SIZE = 64 * 1024
+
 
 class TunnelProxy:
     """
@@ -26,65 +29,67 @@ class TunnelProxy:
     remote and local hosts.
     Attributes:\n
         config (TunnelConfig): Configuration for the tunnel.
-        on_data_transfer (Callable[[int], Any] | None): Optional callback for data transfer events.
+        on_data_transfer (Callable[[int], None] | None): Optional callback for data transfer events.
     """
 
     def __init__(
         self,
         config: TunnelConfig,
-        on_data_transfer: Callable[[int], Any] | None = None,
+        on_data_transfer: Callable[[int], None] | None = None,
     ) -> None:
         """Initialize tunnel proxy."""
         self.config = config
         self.on_data_transfer = on_data_transfer
         self._running = False
         self._connections: set[asyncio.Task[Any]] = set()
-        self._server_socket: socket.socket | None = None
+        self._pipes: set[_PipeProtocol] = set()
+        self._server: asyncio.Server | None = None
+        self._buffer_size = max(config.buffer_size, _MIN_PIPE_BUFFER_SIZE)
+        self._local_slots = asyncio.Semaphore(config.max_connections)
 
     async def start(self) -> None:
-        """Start the TCP proxy."""
+        """
+        Start the TCP proxy.\n
+        Accepting is left to the event loop's server, which hands each new
+        socket straight to a pipe protocol. This coroutine then serves until
+        it is cancelled or the proxy is stopped.
+        """
         self._running = True
         logger.info(f"Starting TCP proxy for tunnel {self.config.tunnel_id}")
 
         try:
-            self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self._server_socket.bind((self.config.remote_host, self.config.remote_port))
-            self._server_socket.listen(int(self.config.max_connections))
-            self._server_socket.setblocking(False)
-
-            logger.info(
-                f"TCP proxy listening on {self.config.remote_host}:{self.config.remote_port}"
+            self._server = await asyncio.get_running_loop().create_server(
+                self._create_client_protocol,
+                self.config.remote_host,
+                self.config.remote_port,
+                family=socket.AF_INET,
+                backlog=int(self.config.max_connections),
+                reuse_address=True,
             )
-
-            while self._running:
-                try:
-                    (
-                        client_socket,
-                        client_addr,
-                    ) = await asyncio.get_event_loop().sock_accept(self._server_socket)
-
-                    task = asyncio.create_task(
-                        self._handle_tcp_connection(client_socket, client_addr)
-                    )
-                    self._connections.add(task)
-                    task.add_done_callback(self._connections.discard)
-
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    if self._running:
-                        logger.error(f"Error accepting TCP connection: {e}")
-                        await asyncio.sleep(1)
-
         except Exception as e:
             logger.error(f"Failed to start TCP proxy: {e}")
             raise TunnelError(f"TCP proxy startup failed: {e}") from e
 
+        logger.info(
+            f"TCP proxy listening on {self.config.remote_host}:{self.config.remote_port}"
+        )
+
+        await self._server.serve_forever()
+
     async def stop(self) -> None:
-        """Stop the proxy."""
+        """
+        Stop the proxy.\n
+        Every open pipe is closed before waiting for the server, since
+        Server.wait_closed() also waits for the transports it accepted.
+        """
         self._running = False
 
+        if self._server:
+            self._server.close()
+
+        for pipe in list(self._pipes):
+            pipe.close()
+
         for task in list(self._connections):
             if not task.done():
                 task.cancel()
@@ -93,79 +98,180 @@ class TunnelProxy:
 
         self._connections.clear()
 
-        if self._server_socket:
-            self._server_socket.close()
-            self._server_socket = None
+        if self._server:
+            await self._server.wait_closed()
+            self._server = None
 
         logger.info(f"TCP proxy stopped for tunnel {self.config.tunnel_id}")
 
-    async def _handle_tcp_connection(
-        self, client_socket: socket.socket, client_addr: tuple[Any, Any]
-    ) -> None:
-        """Handle individual TCP connection."""
+    def _create_client_protocol(self) -> _PipeProtocol:
+        """Create the pipe protocol for a newly accepted client connection."""
+        return _PipeProtocol(
+            asyncio.get_running_loop(),
+            self._buffer_size,
+            self.on_data_transfer,
+            on_connection_made=self._on_client_connected,
+        )
+
+    def _on_client_connected(self, client_protocol: _PipeProtocol) -> None:
+        """
+        Start piping an accepted client connection to the local service.\n
+        Clients accepted after stop() began are closed straight away.
+        Otherwise the client is closed when its task finishes, which also
+        covers a task cancelled before it started running.
+        """
+        if not self._running:
+            client_protocol.close()
+            return
+
+        self._pipes.add(client_protocol)
+        client_protocol.closed.add_done_callback(
+            lambda _: self._pipes.discard(client_protocol)
+        )
+
+        task = asyncio.create_task(self._handle_tcp_connection(client_protocol))
+        self._connections.add(task)
+        task.add_done_callback(self._connections.discard)
+        task.add_done_callback(lambda _: client_protocol.close())
+
+    async def _handle_tcp_connection(self, client_protocol: _PipeProtocol) -> None:
+        """
+        Handle individual TCP connection.\n
+        Both sockets are driven by transports whose protocols write received
+        data straight into the opposite transport, so forwarded bytes never
+        pass through a coroutine. Write-buffer backpressure on either side
+        pauses reading on the other.
+        At most max_connections local connections are open at once; further
+        clients wait, with reading paused, until a slot frees up.
+        """
+        client_transport = cast("asyncio.Transport", client_protocol._transport)
+        client_addr = client_transport.get_extra_info("peername")
         logger.debug(f"New TCP connection from {client_addr!s}")
 
-        local_socket = None
-        try:
-            local_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            await asyncio.get_event_loop().sock_connect(
-                local_socket, (self.config.local_host, self.config.local_port)
-            )
+        loop = asyncio.get_running_loop()
+        local_protocol = _PipeProtocol(loop, self._buffer_size, self.on_data_transfer)
+        local_transport: asyncio.Transport | None = None
 
-            client_to_local = asyncio.create_task(
-                self._forward_data(client_socket, local_socket, "client->local")
-            )
-            local_to_client = asyncio.create_task(
-                self._forward_data(local_socket, client_socket, "local->client")
-            )
+        try:
+            async with self._local_slots:
+                local_transport, _ = await loop.create_connection(
+                    lambda: local_protocol,
+                    self.config.local_host,
+                    self.config.local_port,
+                )
 
-            _, pending = await asyncio.wait(
-                [client_to_local, local_to_client],
-                return_when=asyncio.FIRST_COMPLETED,
-            )
+                local_protocol.connect(client_protocol)
+                client_protocol.connect(local_protocol)
 
-            for task in pending:
-                task.cancel()
-                with contextlib.suppress(asyncio.CancelledError):
-                    await task
+                await asyncio.gather(local_protocol.closed, client_protocol.closed)
 
         except Exception as e:
             logger.error(f"Error handling TCP connection from {client_addr}: {e}")
         finally:
-            with contextlib.suppress(Exception):
-                client_socket.close()
-            with contextlib.suppress(Exception):
-                if local_socket is not None:
-                    local_socket.close()
+            if local_transport is not None:
+                local_transport.close()
             logger.debug(f"TCP connection from {client_addr} closed")
 
-    async def _forward_data(
-        self, src_socket: socket.socket, dst_socket: socket.socket, direction: str
-    ) -> None:
-        """Forward data between sockets."""
-        try:
-            while self._running:
-                data = await asyncio.get_event_loop().sock_recv(
-                    src_socket, self.config.buffer_size
-                )
-
-                if not data:
-                    break
-
-                await asyncio.get_event_loop().sock_sendall(dst_socket, data)
-
-                if self.on_data_transfer:
-                    await self.on_data_transfer(len(data))
-
-                logger.debug(f"Forwarded {len(data)} bytes ({direction})")
-
-        except Exception as e:
-            logger.debug(f"Data forwarding stopped ({direction}): {e}")
-
     def get_connection_count(self) -> int:
         """Get current number of active connections."""
-        return len([task for task in self._connections if not task.done()])
+        # Finished tasks remove themselves via their done callback.
+        return len(self._connections)
 
     def is_running(self) -> bool:
         """Check if proxy is running."""
         return self._running
+
+
+class _PipeProtocol(asyncio.BufferedProtocol):
+    """
+    One end of a bidirectional TCP pipe.\n
+    Reading stays paused until the protocol is connected to its peer, after
+    which every received chunk is written directly to the peer's transport.
+    Data is received into a reusable per-connection buffer, which is only
+    replaced when the peer transport had to queue part of a chunk.
+    An EOF from one side is passed on as a half-close; once both sides have
+    finished, or either side is lost, both transports are closed.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        buffer_size: int,
+        on_data_transfer: Callable[[int], None] | None,
+        on_connection_made: Callable[[_PipeProtocol], None] | None = None,
+    ) -> None:
+        """Initialize pipe protocol."""
+        self.closed: asyncio.Future[None] = loop.create_future()
+        self._buffer = memoryview(bytearray(buffer_size))
+        self._on_data_transfer = on_data_transfer
+        self._on_connection_made = on_connection_made
+        self._transport: asyncio.Transport | None = None
+        self._peer: _PipeProtocol | None = None
+        self._eof = False
+
+    def connect(self, peer: _PipeProtocol) -> None:
+        """Start forwarding received data to peer."""
+        self._peer = peer
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.resume_reading()
+        elif peer._transport is not None:
+            peer._transport.close()
+
+    def close(self) -> None:
+        """Close this end's transport, if it was ever connected."""
+        if self._transport is not None:
+            self._transport.close()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = cast("asyncio.Transport", transport)
+        self._transport.pause_reading()
+        if self._on_connection_made is not None:
+            self._on_connection_made(self)
+
+    def get_buffer(self, _sizehint: int) -> memoryview:
+        return self._buffer
+
+    def buffer_updated(self, nbytes: int) -> None:
+        peer_transport = self._peer._transport if self._peer else None
+        if peer_transport is None:
+            return
+
+        peer_transport.write(self._buffer[:nbytes])
+        if peer_transport.get_write_buffer_size():
+            # The transport still references the unsent part of the buffer,
+            # so the next read must not overwrite it.
+            self._buffer = memoryview(bytearray(len(self._buffer)))
+
+        if self._on_data_transfer is not None:
+            self._on_data_transfer(nbytes)
+
+    def eof_received(self) -> bool:
+        self._eof = True
+        peer = self._peer
+        if (
+            peer is not None
+            and not peer._eof
+            and peer._transport is not None
+            and peer._transport.can_write_eof()
+        ):
+            # Half-close: pass the EOF on and keep the other direction open.
+            peer._transport.write_eof()
+            return True
+        # Returning False lets the transport close, which tears down the peer.
+        return False
+
+    def pause_writing(self) -> None:
+        if self._peer is not None and self._peer._transport is not None:
+            self._peer._transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        if self._peer is not None and self._peer._transport is not None:
+            self._peer._transport.resume_reading()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if exc is not None:
+            logger.debug(f"TCP pipe closed with error: {exc}")
+        if self._peer is not None and self._peer._transport is not None:
+            self._peer._transport.close()
+        if not self.closed.done():
+            self.closed.set_result(None)
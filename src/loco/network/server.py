@@ -6,20 +6,24 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import errno
+import inspect
+import json
 import socket
 import ssl
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from aiohttp import ClientSession, ClientTimeout, TCPConnector, WSMsgType, web
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, WSMsgType, hdrs, web
 from aiohttp.web_ws import WebSocketResponse
+from multidict import CIMultiDict
 
 from ..core.exceptions import TunnelError
-from ..core.models import TunnelConfig, TunnelProtocol
+from ..core.models import LogEntry, TunnelConfig, TunnelProtocol
 from ..utils.logging import get_logger
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Mapping
 
     from aiohttp.web_request import Request
     from aiohttp.web_response import Response, StreamResponse
@@ -27,6 +31,29 @@ if TYPE_CHECKING:
 
 logger = get_logger("loco.network.server")
 
+# aiohttp's header constants are istr instances, which multidict matches
+# case-insensitively without lowercasing the key on every lookup.
+_HOP_BY_HOP_HEADERS = frozenset(
+    {
+        hdrs.CONNECTION,
+        hdrs.KEEP_ALIVE,
+        hdrs.PROXY_AUTHENTICATE,
+        hdrs.PROXY_AUTHORIZATION,
+        hdrs.TE,
+        hdrs.TRAILER,
+        hdrs.TRANSFER_ENCODING,
+        hdrs.UPGRADE,
+    }
+)
+
+
+def _without_hop_by_hop(headers: Mapping[str, str]) -> CIMultiDict[str]:
+    """Copy headers, keeping repeated fields, without the hop-by-hop ones."""
+    filtered = CIMultiDict(headers)
+    for name in _HOP_BY_HOP_HEADERS:
+        filtered.popall(name, None)
+    return filtered
+
 
 class TunnelServer:
     """
@@ -44,7 +71,7 @@ class TunnelServer:
         config: TunnelConfig,
         on_connection: Callable[[dict[str, Any]], Any] | None = None,
         on_disconnection: Callable[[dict[str, Any]], Any] | None = None,
-        on_log_request: Callable[[dict[str, Any]], Any] | None = None,
+        on_log_request: Callable[[LogEntry], None] | None = None,
     ) -> None:
         """Initialize tunnel server."""
         self.config = config
@@ -54,12 +81,52 @@ class TunnelServer:
         self._runner: web.AppRunner | None = None
         self._site: web.TCPSite | None = None
         self._client_session: ClientSession | None = None
+        self._stopped = asyncio.Event()
+
+        # TunnelConfig is frozen, so the forwarded headers that only depend on
+        # it are built once and merged into every proxied request.
+        self._static_proxy_headers = {
+            "Host": f"{config.local_host}:{config.local_port}",
+            "X-Forwarded-Proto": config.protocol.value,
+            "X-Forwarded-Port": str(config.remote_port),
+        }
+        self._default_forwarded_host = f"localhost:{config.remote_port}"
+
+        # Use http/ws for local connections even if the tunnel uses https/wss
+        # TODO(daniel): Support https and wss for local connections later
+        self._local_http_url = f"http://{config.local_host}:{config.local_port}"
+        self._local_ws_url = f"ws://{config.local_host}:{config.local_port}"
+
+        self._health_body = json.dumps(
+            {
+                "status": "healthy",
+                "tunnel_id": config.tunnel_id,
+                "local_service": f"{config.local_host}:{config.local_port}",
+            }
+        ).encode()
+        # The stats payload only varies with is_serving(), so both variants are
+        # serialized up front.
+        self._stats_bodies = {
+            is_serving: json.dumps(
+                {
+                    "config": config.model_dump(mode="json", exclude_unset=True),
+                    "server_info": {
+                        "host": config.remote_host,
+                        "port": config.remote_port,
+                        "protocol": config.protocol.value,
+                        "is_serving": is_serving,
+                    },
+                }
+            ).encode()
+            for is_serving in (False, True)
+        }
 
         self._app = web.Application()
         self._setup_routes()
 
     async def start(self) -> None:
         """Start the server."""
+        self._stopped.clear()
         try:
             logger.info(
                 f"Starting tunnel server on {self.config.remote_host}:{self.config.remote_port}"
@@ -80,17 +147,28 @@ class TunnelServer:
                 sock_connect=10,
             )
 
+            # Every upstream connection goes to the one local service, so the
+            # per-host limit is the effective pool size; size both from the
+            # tunnel's connection limit so requests don't queue below it.
+            # Bodies are relayed as the local service encoded them, which keeps
+            # its Content-Encoding and Content-Length headers accurate.
             self._client_session = ClientSession(
                 timeout=timeout,
+                auto_decompress=False,
                 connector=TCPConnector(
-                    limit=100,
-                    limit_per_host=30,
+                    limit=self.config.max_connections,
+                    limit_per_host=self.config.max_connections,
                     enable_cleanup_closed=True,
                     keepalive_timeout=30,
+                    ttl_dns_cache=300,
                 ),
             )
 
-            self._runner = web.AppRunner(self._app, access_log=None)
+            # Cancel the handler when the client goes away, so an abandoned
+            # response stops pulling data from the local service.
+            self._runner = web.AppRunner(
+                self._app, access_log=None, handler_cancellation=True
+            )
             await self._runner.setup()
 
             ssl_context = None
@@ -117,16 +195,15 @@ class TunnelServer:
                     await self._site.start()
                     logger.info(f"Site started successfully on attempt {attempt + 1}")
                     break
-                except Exception as e:
+                except OSError as e:
+                    # Only a port still held by a closing socket is worth retrying.
+                    if e.errno != errno.EADDRINUSE or attempt == 2:
+                        raise
                     logger.warning(
                         f"Failed to start site on attempt {attempt + 1}: {e}"
                     )
-                    if attempt == 2:
-                        raise
                     await asyncio.sleep(1)
 
-            await asyncio.sleep(1)
-
             if not await self._verify_server_running():
                 raise TunnelError("Server failed to start - port may not be accessible")
 
@@ -154,6 +231,7 @@ class TunnelServer:
 
     async def stop(self) -> None:
         """Stop the server."""
+        self._stopped.set()
         try:
             logger.info("Stopping tunnel server...")
 
@@ -179,117 +257,54 @@ class TunnelServer:
         return self._runner is not None and self._site is not None
 
     async def serve_forever(self) -> None:
-        """Keep the server running."""
-        while self.is_serving():
-            await asyncio.sleep(1)
+        """Keep the server running until it is stopped."""
+        if self.is_serving():
+            await self._stopped.wait()
 
     async def _is_port_in_use(self, host: str, port: int) -> bool:
         """Check if a port is already in use."""
-        try:
-            test_hosts = []
-            if host == "0.0.0.0":
-                test_hosts = ["127.0.0.1", "localhost"]
-            else:
-                test_hosts = [host if host != "0.0.0.0" else "127.0.0.1"]
+        if host == "0.0.0.0":
+            host = "127.0.0.1"
 
-            for test_host in test_hosts:
-                try:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(1)
-                    result = sock.connect_ex((test_host, port))
-                    sock.close()
-                    if result == 0:
-                        logger.warning(f"Port {port} is already in use on {test_host}")
-                        return True
-                except Exception:
-                    continue
-            return False
-        except Exception:
-            return False
+        if await self._can_connect(host, port, timeout=0.2):
+            logger.warning(f"Port {port} is already in use on {host}")
+            return True
+        return False
 
     async def _verify_server_running(self) -> bool:
-        """Verify the server is actually running."""
-        test_hosts = ["127.0.0.1", "localhost"]
-
-        for host_to_check in test_hosts:
-            for attempt in range(5):
-                try:
-                    logger.debug(
-                        f"Verifying server connection to {host_to_check}:{self.config.remote_port} (attempt {attempt + 1}/5)"
-                    )
-
-                    try:
-                        reader, writer = await asyncio.wait_for(
-                            asyncio.open_connection(
-                                host_to_check, self.config.remote_port
-                            ),
-                            timeout=3.0,
-                        )
-
-                        request = f"GET / HTTP/1.1\r\nHost: {host_to_check}:{self.config.remote_port}\r\nConnection: close\r\n\r\n"
-                        writer.write(request.encode())
-                        await writer.drain()
-
-                        try:
-                            response = await asyncio.wait_for(
-                                reader.read(1024), timeout=2.0
-                            )
-                            logger.debug(
-                                f"Received response: {response.decode()[:100]}..."
-                            )
-                        except TimeoutError:
-                            logger.debug("Response read timeout (this might be normal)")
-
-                        writer.close()
-                        await writer.wait_closed()
-
-                        logger.info(
-                            f"Successfully verified server running at {host_to_check}:{self.config.remote_port}"
-                        )
-                        return True
-
-                    except Exception as e:
-                        logger.debug(f"HTTP verification failed: {e}")
-
-                        reader, writer = await asyncio.wait_for(
-                            asyncio.open_connection(
-                                host_to_check, self.config.remote_port
-                            ),
-                            timeout=2.0,
-                        )
-                        writer.close()
-                        await writer.wait_closed()
-                        logger.info(
-                            f"Successfully verified server running at {host_to_check}:{self.config.remote_port} (socket test)"
-                        )
-                        return True
-
-                except Exception as e:
-                    logger.debug(
-                        f"Attempt {attempt + 1}/5: Failed to verify server running at {host_to_check}:{self.config.remote_port}. Error: {e}"
-                    )
-                    await asyncio.sleep(0.5)
-
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(3)
-            result = sock.connect_ex(("127.0.0.1", self.config.remote_port))
-            sock.close()
-            if result == 0:
-                logger.info(
-                    f"Socket check: Server is running at 127.0.0.1:{self.config.remote_port}"
-                )
-                return True
-            else:
-                logger.error(
-                    f"Socket check: Server is not running. Connection result: {result}"
-                )
-        except Exception as e:
-            logger.error(f"Socket check failed: {e}")
+        """
+        Verify the server is accepting TCP connections.\n
+        The site is already listening once TCPSite.start() returns, so a
+        single connect probe is enough.
+        """
+        host = self.config.remote_host
+        if host == "0.0.0.0":
+            host = "127.0.0.1"
+        port = self.config.remote_port
+
+        if await self._can_connect(host, port, timeout=1.0):
+            logger.info(f"Verified server running at {host}:{port}")
+            return True
 
         logger.error("Server verification failed. The tunnel may not be accessible.")
         return False
 
+    async def _can_connect(self, host: str, port: int, timeout: float) -> bool:
+        """
+        Check whether a TCP connection to host and port is accepted.\n
+        The connect is non-blocking, so the event loop keeps running while
+        the probe waits, and no data is exchanged.
+        """
+        loop = asyncio.get_running_loop()
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setblocking(False)
+            try:
+                await asyncio.wait_for(loop.sock_connect(sock, (host, port)), timeout)
+            except (OSError, TimeoutError) as e:
+                logger.debug(f"Could not connect to {host}:{port}: {e}")
+                return False
+        return True
+
     async def _setup_ssl(self) -> ssl.SSLContext:
         """Setup SSL context if certificates are provided."""
         if not self.config.ssl_cert_path or not self.config.ssl_key_path:
@@ -301,6 +316,10 @@ class TunnelServer:
 
     def _setup_routes(self) -> None:
         """Set up HTTP routes"""
+        # The tunnel's own endpoints are registered ahead of the catch-all so
+        # they never enter the proxy path.
+        self._app.router.add_get("/_tunnel/health", self._handle_health_check)
+        self._app.router.add_get("/_tunnel/stats", self._handle_stats)
         self._app.router.add_route("*", "/{path:.*}", self._handle_request)
 
     async def _handle_request(self, request: Request) -> Response | StreamResponse:
@@ -313,34 +332,35 @@ class TunnelServer:
                 content_type="text/plain",
             )
 
+        # Upgrade is hop-by-hop, so WebSocket handshakes are proxied as
+        # WebSockets; that handler does its own connection bookkeeping.
+        if request.headers.get(hdrs.UPGRADE, "").lower() == "websocket":
+            return await self._handle_websocket_proxy(request)
+
         if self.on_connection:
-            await self.on_connection(
+            result = self.on_connection(
                 {
                     "remote_addr": request.remote,
                     "method": request.method,
                     "path": request.path,
-                    "headers": dict(request.headers),
+                    # Read-only view of the request headers; copy it to keep it.
+                    "headers": request.headers,
                 }
             )
+            # Plain functions are called inline; only coroutines are awaited.
+            if inspect.isawaitable(result):
+                await result
 
-        if request.method == "GET" and request.path == "/_tunnel/health":
-            return await self._handle_health_check()
-        elif request.method == "GET" and request.path == "/_tunnel/stats":
-            return await self._handle_stats()
-
-        start_time = asyncio.get_event_loop().time()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         response = None
 
         try:
-            if request.headers.get("Upgrade", "").lower() == "websocket":
-                return await self._handle_websocket_proxy(request)
-
             target_url = self._build_target_url(request)
             headers = self._prepare_proxy_headers(request)
 
-            body_data = None
-            if request.can_read_body:
-                body_data = await request.read()
+            # Stream the request body straight through instead of buffering it.
+            body = request.content if request.can_read_body else None
 
             logger.debug(f"Proxying {request.method} {request.path} to {target_url}")
 
@@ -348,23 +368,14 @@ class TunnelServer:
                 method=request.method,
                 url=target_url,
                 headers=headers,
-                data=body_data,
+                data=body,
+                # A streamed body would otherwise gain a default Content-Type
+                # the client never sent.
+                skip_auto_headers=("Content-Type",),
                 allow_redirects=False,
                 raise_for_status=False,
             ) as local_response:
-                response_headers = dict(local_response.headers)
-
-                for header in [
-                    "connection",
-                    "keep-alive",
-                    "proxy-authenticate",
-                    "proxy-authorization",
-                    "te",
-                    "trailers",
-                    "transfer-encoding",
-                    "upgrade",
-                ]:
-                    response_headers.pop(header, None)
+                response_headers = _without_hop_by_hop(local_response.headers)
 
                 response = web.StreamResponse(
                     status=local_response.status,
@@ -374,30 +385,31 @@ class TunnelServer:
 
                 await response.prepare(request)
 
-                async for chunk in local_response.content.iter_chunked(8192):
+                # Forward whatever the client session has buffered so large
+                # reads go out in one write instead of fixed 8 KiB slices.
+                async for chunk in local_response.content.iter_any():
                     await response.write(chunk)
 
                 await response.write_eof()
 
-                if self.on_disconnection:
-                    await self.on_disconnection({"remote_addr": request.remote})
-
-                end_time = asyncio.get_event_loop().time()
-                duration_ms = (end_time - start_time) * 1000
-
-                log_entry: dict[str, Any] = {
-                    "timestamp": datetime.now().isoformat(),
-                    "method": request.method,
-                    "path": request.path,
-                    "status": response.status,
-                    "ip": request.remote,
-                    "duration": duration_ms,
-                    "headers": dict(request.headers),
-                    "query_string": request.query_string,
-                }
+                if self.on_log_request is not None:
+                    duration_ms = (loop.time() - start_time) * 1000
+
+                    log_entry = LogEntry(
+                        tunnel_id=self.config.tunnel_id,
+                        timestamp=datetime.now().isoformat(),
+                        method=request.method,
+                        path=request.path,
+                        status=response.status,
+                        ip=request.remote,
+                        duration=duration_ms,
+                        query_string=request.query_string,
+                        headers=dict(request.headers),
+                    )
 
-                if hasattr(self, "on_log_request") and callable(self.on_log_request):
-                    await self.on_log_request(log_entry)
+                    # Log handlers only queue the entry, so they are called
+                    # inline rather than paying for a task per request.
+                    self.on_log_request(log_entry)
 
                 return response
 
@@ -417,42 +429,30 @@ class TunnelServer:
                 text=error_msg,
                 content_type="text/plain",
             )
-
-    def _build_target_url(self, request: Request) -> str:
+        finally:
+            # Runs on errors and cancellation too, so every counted connection
+            # is released.
+            if self.on_disconnection:
+                result = self.on_disconnection({"remote_addr": request.remote})
+                if inspect.isawaitable(result):
+                    await result
+
+    def _build_target_url(self, request: Request, base_url: str | None = None) -> str:
         """Build the target URL for the local service."""
-        # Use http for local connections even if tunnel uses https for now
-        # TODO(daniel): Support https for local connections later
-        scheme = "http"
-        target_url = f"{scheme}://{self.config.local_host}:{self.config.local_port}{request.path}"
+        target_url = (base_url or self._local_http_url) + request.path
 
         if request.query_string:
-            target_url += f"?{request.query_string}"
+            return target_url + "?" + request.query_string
 
         return target_url
 
-    def _prepare_proxy_headers(self, request: Request) -> dict[str, str]:
+    def _prepare_proxy_headers(self, request: Request) -> CIMultiDict[str]:
         """Prepare headers for proxying to local service."""
-        headers = dict(request.headers)
-
-        headers["Host"] = f"{self.config.local_host}:{self.config.local_port}"
-
+        # The body framing is left to the client session.
+        headers = _without_hop_by_hop(request.headers)
+        headers.update(self._static_proxy_headers)
         headers["X-Forwarded-For"] = request.remote or "unknown"
-        headers["X-Forwarded-Proto"] = self.config.protocol.value
-        headers["X-Forwarded-Host"] = (
-            request.host or f"localhost:{self.config.remote_port}"
-        )
-        headers["X-Forwarded-Port"] = str(self.config.remote_port)
-
-        for header in [
-            "connection",
-            "keep-alive",
-            "proxy-authenticate",
-            "proxy-authorization",
-            "te",
-            "trailers",
-            "upgrade",
-        ]:
-            headers.pop(header, None)
+        headers["X-Forwarded-Host"] = request.host or self._default_forwarded_host
 
         return headers
 
@@ -461,27 +461,26 @@ class TunnelServer:
         if self._client_session is None:
             raise TunnelError("Client session not initialized")
 
-        ws_server = WebSocketResponse()
+        # Text frames are relayed undecoded; the payload is never inspected.
+        ws_server = WebSocketResponse(decode_text=False)
         await ws_server.prepare(request)
 
         if self.on_connection:
-            await self.on_connection(
+            result = self.on_connection(
                 {"remote_addr": request.remote, "type": "websocket"}
             )
+            if inspect.isawaitable(result):
+                await result
 
         try:
-            # Use ws for local connections even if tunnel uses ws for now
-            # TODO(Daniel): Support wss for local connections later
-            ws_scheme = "ws"  # Use ws even if tunnel is wss
-            local_ws_url = f"{ws_scheme}://{self.config.local_host}:{self.config.local_port}{request.path}"
-            if request.query_string:
-                local_ws_url += f"?{request.query_string}"
+            local_ws_url = self._build_target_url(request, self._local_ws_url)
 
             headers = self._prepare_proxy_headers(request)
 
             ws_client = await self._client_session.ws_connect(
                 local_ws_url,
                 headers=headers,
+                decode_text=False,
             )
 
             async def forward_messages(
@@ -491,7 +490,7 @@ class TunnelServer:
                 try:
                     async for msg in source:
                         if msg.type == WSMsgType.TEXT:
-                            await target.send_str(msg.data)
+                            await target.send_frame(msg.data, WSMsgType.TEXT)
                         elif msg.type == WSMsgType.BINARY:
                             await target.send_bytes(msg.data)
                         elif msg.type == WSMsgType.CLOSE:
@@ -508,22 +507,17 @@ class TunnelServer:
                     with contextlib.suppress(Exception):
                         await target.close()
 
-            client_to_server = asyncio.create_task(
-                forward_messages(ws_server, ws_client, "client->server")
-            )
+            # Each direction closes its target when it ends, which also ends the
+            # other direction's reads, so only one of them needs its own task.
             server_to_client = asyncio.create_task(
                 forward_messages(ws_client, ws_server, "server->client")
             )
-
-            _, pending = await asyncio.wait(
-                [client_to_server, server_to_client],
-                return_when=asyncio.FIRST_COMPLETED,
-            )
-
-            for task in pending:
-                task.cancel()
+            try:
+                await forward_messages(ws_server, ws_client, "client->server")
+            finally:
+                server_to_client.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
-                    await task
+                    await server_to_client
 
             with contextlib.suppress(Exception):
                 await ws_client.close()
@@ -531,9 +525,11 @@ class TunnelServer:
         except Exception as e:
             logger.error(f"Error handling WebSocket proxy: {e}")
             await ws_server.close(code=1011, message=str(e).encode())
-
-        if self.on_disconnection:
-            await self.on_disconnection({"remote_addr": request.remote})
+        finally:
+            if self.on_disconnection:
+                result = self.on_disconnection({"remote_addr": request.remote})
+                if inspect.isawaitable(result):
+                    await result
 
         return ws_server
 
@@ -559,26 +555,13 @@ class TunnelServer:
             )
             return False
 
-    async def _handle_health_check(self) -> Response:
+    async def _handle_health_check(self, _request: Request) -> Response:
         """Handle health check requests."""
-        return web.json_response(
-            {
-                "status": "healthy",
-                "tunnel_id": self.config.tunnel_id,
-                "local_service": f"{self.config.local_host}:{self.config.local_port}",
-            }
-        )
+        return web.Response(body=self._health_body, content_type="application/json")
 
-    async def _handle_stats(self) -> Response:
+    async def _handle_stats(self, _request: Request) -> Response:
         """Handle stats requests."""
-        return web.json_response(
-            {
-                "config": self.config.model_dump(exclude_unset=True),
-                "server_info": {
-                    "host": self.config.remote_host,
-                    "port": self.config.remote_port,
-                    "protocol": self.config.protocol.value,
-                    "is_serving": self.is_serving(),
-                },
-            }
+        return web.Response(
+            body=self._stats_bodies[self.is_serving()],
+            content_type="application/json",
         )
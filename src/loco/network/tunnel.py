@@ -4,22 +4,38 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import time
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any
 
 from ..core.exceptions import TunnelError, TunnelStartupError
-from ..core.models import TunnelConfig, TunnelProtocol, TunnelState, TunnelStatus
+from ..core.models import (
+    ACTIVE_STATUSES,
+    LogEntry,
+    LogStreamable,
+    TunnelConfig,
+    TunnelProtocol,
+    TunnelState,
+    TunnelStatus,
+)
 from ..utils.logging import get_logger
 from .proxy import TunnelProxy
 from .server import TunnelServer
 
 logger = get_logger("loco.network.tunnel")
 
+_HTTP_PROTOCOLS = frozenset(
+    {TunnelProtocol.HTTP, TunnelProtocol.HTTPS, TunnelProtocol.WEBSOCKET}
+)
+
+# Traffic callbacks refresh last_activity at most this often, in seconds.
+_ACTIVITY_RESOLUTION = 1.0
+
 if TYPE_CHECKING:
     from collections.abc import Callable
 
 
-class Tunnel:
+class Tunnel(LogStreamable):
     """
     A Tunnel instance.\n
     This class manages the lifecycle of a tunnel, including starting,
@@ -46,6 +62,8 @@ class Tunnel:
         self._proxy: TunnelProxy | None = None
         self._server_task: asyncio.Task[Any] | None = None
         self._proxy_task: asyncio.Task[Any] | None = None
+        self._log_handlers: list[Callable[[LogEntry], None]] = []
+        self._next_activity_update = 0.0
 
     async def start(self) -> None:
         """Start the tunnel."""
@@ -58,16 +76,12 @@ class Tunnel:
             self.state.started_at = datetime.now(UTC)
             self.state.stopped_at = None
 
-            if self.config.protocol in [
-                TunnelProtocol.HTTP,
-                TunnelProtocol.HTTPS,
-                TunnelProtocol.WEBSOCKET,
-            ]:
+            if self.config.protocol in _HTTP_PROTOCOLS:
                 self._server = TunnelServer(
                     config=self.config,
                     on_connection=self._on_connection,
                     on_disconnection=self._on_disconnection,
-                    on_log_request=self._log_request,
+                    on_log_request=self._log_request if self._log_handlers else None,
                 )
                 await self._server.start()
                 self._server_task = asyncio.create_task(self._server.serve_forever())
@@ -121,7 +135,7 @@ class Tunnel:
 
     def is_active(self) -> bool:
         """Check if tunnel is active."""
-        return self.state.status in (TunnelStatus.STARTING, TunnelStatus.ACTIVE)
+        return self.state.status in ACTIVE_STATUSES
 
     def get_stats(self) -> dict[str, Any]:
         """Get tunnel statistics."""
@@ -178,45 +192,53 @@ class Tunnel:
             await self._proxy.stop()
             self._proxy = None
 
-    async def _on_connection(self, _connection_info: dict[str, Any]) -> None:
+    def _on_connection(self, _connection_info: dict[str, Any]) -> None:
         """Handle new connection."""
         self.state.active_connections += 1
         self.state.total_connections += 1
-        self.state.last_activity = datetime.now(UTC)
+        self._touch()
 
-    async def _on_disconnection(self, _connection_info: dict[str, Any]) -> None:
+    def _on_disconnection(self, _connection_info: dict[str, Any]) -> None:
         """Handle connection disconnection."""
         if self.state.active_connections > 0:
             self.state.active_connections -= 1
-        self.state.last_activity = datetime.now(UTC)
+        self._touch()
 
-    async def _on_data_transfer(self, bytes_count: int) -> None:
+    def _on_data_transfer(self, bytes_count: int) -> None:
         """Handle data transfer."""
         self.state.bytes_transferred += bytes_count
-        self.state.last_activity = datetime.now(UTC)
+        self._touch()
+
+    def _touch(self) -> None:
+        """Record traffic in last_activity, refreshing it at most once a second."""
+        # Checking the monotonic clock is far cheaper than building an aware
+        # datetime, which these callbacks would otherwise do for every chunk.
+        now = time.monotonic()
+        if now >= self._next_activity_update:
+            self._next_activity_update = now + _ACTIVITY_RESOLUTION
+            self.state.last_activity = datetime.now(UTC)
 
-    def register_log_handler(self, handler: Callable[[dict[str, Any]], None]) -> None:
+    def register_log_handler(self, handler: Callable[[LogEntry], None]) -> None:
         """Register a log handler function."""
-        self._log_handlers = getattr(self, "_log_handlers", [])
         self._log_handlers.append(handler)
+        if self._server:
+            self._server.on_log_request = self._log_request
 
-    def unregister_log_handler(self, handler: Callable[[dict[str, Any]], None]) -> None:
+    def unregister_log_handler(self, handler: Callable[[LogEntry], None]) -> None:
         """Unregister a log handler function."""
-        self._log_handlers = getattr(self, "_log_handlers", [])
         if handler in self._log_handlers:
             self._log_handlers.remove(handler)
-
-    async def _log_request(self, request_info: dict[str, Any]) -> None:
-        """Log a request."""
-        if hasattr(self, "_log_handlers"):
-            for handler in self._log_handlers:
-                try:
-                    if asyncio.iscoroutinefunction(handler):
-                        await handler(request_info)
-                    else:
-                        handler(request_info)
-                except Exception as e:
-                    logger.error(f"Error in log handler: {e}")
+        # Without handlers the server skips building request log entries.
+        if self._server and not self._log_handlers:
+            self._server.on_log_request = None
+
+    def _log_request(self, log_entry: LogEntry) -> None:
+        """Pass a request log entry to every registered handler."""
+        for handler in self._log_handlers:
+            try:
+                handler(log_entry)
+            except Exception as e:
+                logger.error(f"Error in log handler: {e}")
 
     def __str__(self) -> str:
         return f"Tunnel({self.config.tunnel_id[:8]}...)"
@@ -35,3 +35,9 @@ class StorageBackend(ABC):
     async def delete_tunnel(self, tunnel_id: str) -> None:
         """Delete tunnel data."""
         pass
+
+    async def close(self) -> None:  # noqa: B027
+        """
+        Release resources held by the backend.\n
+        Backends without open handles can keep this default, which does nothing.
+        """
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import os
+import tempfile
 from pathlib import Path
-
-import aiofiles
+from typing import ClassVar
 
 from ..core.exceptions import StorageError
 from ..core.models import TunnelConfig, TunnelState
@@ -22,22 +25,34 @@ class FileStorage(StorageBackend):
         state_dir (Path): Directory for tunnel states.
     """
 
+    # Directories already created by an instance in this process.
+    _ensured_dirs: ClassVar[set[Path]] = set()
+
     def __init__(self, base_dir: Path | None = None) -> None:
         """Initialize file storage."""
         self.base_dir = base_dir or Path.home() / ".loco"
         self.config_dir = self.base_dir / "configs"
         self.state_dir = self.base_dir / "states"
+        self._written_states: dict[str, tuple[int, str]] = {}
+
+        self._ensure_dir(self.config_dir)
+        self._ensure_dir(self.state_dir)
 
-        self.config_dir.mkdir(parents=True, exist_ok=True)
-        self.state_dir.mkdir(parents=True, exist_ok=True)
+    @classmethod
+    def _ensure_dir(cls, path: Path) -> None:
+        """Create a directory unless this process has already done so."""
+        if path not in cls._ensured_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            cls._ensured_dirs.add(path)
 
     async def save_tunnel_config(self, config: TunnelConfig) -> None:
         """Save tunnel configuration."""
         try:
             config_path = self.config_dir / f"{config.tunnel_id}.json"
 
-            async with aiofiles.open(config_path, "w") as f:
-                await f.write(config.model_dump_json(indent=2))
+            await asyncio.to_thread(
+                _atomic_write_text, config_path, config.model_dump_json()
+            )
 
         except Exception as e:
             raise StorageError(f"Failed to save tunnel config: {e}") from e
@@ -47,54 +62,79 @@ class FileStorage(StorageBackend):
         try:
             config_path = self.config_dir / f"{tunnel_id}.json"
 
-            if not config_path.exists():
+            try:
+                data = await asyncio.to_thread(config_path.read_bytes)
+            except FileNotFoundError:
                 return None
 
-            async with aiofiles.open(config_path) as f:
-                data = await f.read()
-                return TunnelConfig.model_validate_json(data)
+            return TunnelConfig.model_validate_json(data)
 
         except Exception as e:
             raise StorageError(f"Failed to load config: {e}") from e
 
     async def list_tunnel_configs(self) -> list[TunnelConfig]:
-        """List all tunnel configurations."""
-        configs = []
-
+        """
+        List all tunnel configurations.\n
+        The directory is scanned in one worker thread, and the config files
+        are then loaded concurrently.
+        """
         try:
-            for config_file in self.config_dir.glob("*.json"):
-                async with aiofiles.open(config_file) as f:
-                    data = await f.read()
-                    config = TunnelConfig.model_validate_json(data)
-                    configs.append(config)
-
+            config_files = await asyncio.to_thread(self._scan_config_dir)
+            return list(
+                await asyncio.gather(
+                    *(
+                        asyncio.to_thread(_load_config_sync, config_file)
+                        for config_file in config_files
+                    )
+                )
+            )
         except Exception as e:
             raise StorageError(f"Failed to list configs: {e}") from e
 
-        return configs
+    def _scan_config_dir(self) -> list[Path]:
+        """Get the paths of every config file."""
+        return list(self.config_dir.glob("*.json"))
 
     async def save_tunnel_state(self, state: TunnelState) -> None:
-        """Save tunnel state."""
+        """
+        Save tunnel state.\n
+        Repeated saves of an unchanged state are skipped as long as the file
+        still carries the modification time of the last write made here.
+        The check and the write both run in one worker thread.
+        """
         try:
-            state_path = self.state_dir / f"{state.config.tunnel_id}.json"
-
-            async with aiofiles.open(state_path, "w") as f:
-                await f.write(state.model_dump_json(indent=2))
-
+            await asyncio.to_thread(
+                self._write_state, state.config.tunnel_id, state.model_dump_json()
+            )
         except Exception as e:
             raise StorageError(f"Failed to save state: {e}") from e
 
+    def _write_state(self, tunnel_id: str, data: str) -> None:
+        """Write a state file unless it still holds the last data written here."""
+        state_path = self.state_dir / f"{tunnel_id}.json"
+
+        written = self._written_states.get(tunnel_id)
+        if written is not None and written[1] == data:
+            try:
+                if state_path.stat().st_mtime_ns == written[0]:
+                    return
+            except FileNotFoundError:
+                pass
+
+        _atomic_write_text(state_path, data)
+        self._written_states[tunnel_id] = (state_path.stat().st_mtime_ns, data)
+
     async def load_tunnel_state(self, tunnel_id: str) -> TunnelState | None:
         """Load tunnel state."""
         try:
             state_path = self.state_dir / f"{tunnel_id}.json"
 
-            if not state_path.exists():
+            try:
+                data = await asyncio.to_thread(state_path.read_bytes)
+            except FileNotFoundError:
                 return None
 
-            async with aiofiles.open(state_path) as f:
-                data = await f.read()
-                return TunnelState.model_validate_json(data)
+            return TunnelState.model_validate_json(data)
 
         except Exception as e:
             raise StorageError(f"Failed to load state: {e}") from e
@@ -105,11 +145,41 @@ class FileStorage(StorageBackend):
             config_path = self.config_dir / f"{tunnel_id}.json"
             state_path = self.state_dir / f"{tunnel_id}.json"
 
-            if config_path.exists():
-                config_path.unlink()
+            await asyncio.to_thread(_unlink_files, config_path, state_path)
 
-            if state_path.exists():
-                state_path.unlink()
+            self._written_states.pop(tunnel_id, None)
 
         except Exception as e:
             raise StorageError(f"Failed to delete tunnel: {e}") from e
+
+
+def _load_config_sync(path: Path) -> TunnelConfig:
+    """Read and validate a single tunnel config file."""
+    return TunnelConfig.model_validate_json(path.read_bytes())
+
+
+def _unlink_files(*paths: Path) -> None:
+    """Delete files, ignoring any that do not exist."""
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def _atomic_write_text(path: Path, data: str) -> None:
+    """
+    Write a file by renaming a fully written temporary file over it.\n
+    Readers see either the old or the new contents, never a partial write.
+    The temporary name does not end in .json, so listings skip it.
+    Files are left with mkstemp's owner-only 0600 mode rather than the umask
+    default, which suits configs kept in the user's home directory.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        Path(tmp_path).replace(path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            Path(tmp_path).unlink()
+        raise
@@ -0,0 +1,171 @@
+"""SQLite-based storage implementation."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ..core.exceptions import StorageError
+from ..core.models import TunnelConfig, TunnelState
+from .base import StorageBackend
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tunnels (
+    id TEXT PRIMARY KEY,
+    config_json TEXT,
+    state_json TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+# WAL lets readers in other loco processes proceed while one process writes,
+# and NORMAL sync is durable in WAL mode except across power loss.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class SqliteStorage(StorageBackend):
+    """
+    SQLite storage backend for tunnel configurations and states.\n
+    All tunnels live as rows of a single database file, so listing them is
+    one query instead of a directory scan and a read per tunnel.
+    A single connection is opened lazily and reused; queries run in worker
+    threads and are serialized by a lock.
+    Attributes:
+        db_path (Path): Path of the SQLite database file.
+    """
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        """Initialize SQLite storage."""
+        self.db_path = db_path or Path.home() / ".loco" / "loco.db"
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    async def save_tunnel_config(self, config: TunnelConfig) -> None:
+        """Save tunnel configuration."""
+        try:
+            await self._execute(
+                "INSERT INTO tunnels (id, config_json, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET "
+                "config_json = excluded.config_json, updated_at = excluded.updated_at",
+                (config.tunnel_id, config.model_dump_json(), time.time()),
+            )
+        except Exception as e:
+            raise StorageError(f"Failed to save tunnel config: {e}") from e
+
+    async def load_tunnel_config(self, tunnel_id: str) -> TunnelConfig | None:
+        """Load tunnel configuration."""
+        try:
+            rows = await self._fetch(
+                "SELECT config_json FROM tunnels "
+                "WHERE id = ? AND config_json IS NOT NULL",
+                (tunnel_id,),
+            )
+            if not rows:
+                return None
+            return TunnelConfig.model_validate_json(rows[0][0])
+
+        except Exception as e:
+            raise StorageError(f"Failed to load config: {e}") from e
+
+    async def list_tunnel_configs(self) -> list[TunnelConfig]:
+        """List all tunnel configurations."""
+        try:
+            rows = await self._fetch(
+                "SELECT config_json FROM tunnels WHERE config_json IS NOT NULL"
+            )
+            return [TunnelConfig.model_validate_json(row[0]) for row in rows]
+
+        except Exception as e:
+            raise StorageError(f"Failed to list configs: {e}") from e
+
+    async def save_tunnel_state(self, state: TunnelState) -> None:
+        """Save tunnel state."""
+        try:
+            await self._execute(
+                "INSERT INTO tunnels (id, state_json, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET "
+                "state_json = excluded.state_json, updated_at = excluded.updated_at",
+                (state.config.tunnel_id, state.model_dump_json(), time.time()),
+            )
+        except Exception as e:
+            raise StorageError(f"Failed to save state: {e}") from e
+
+    async def load_tunnel_state(self, tunnel_id: str) -> TunnelState | None:
+        """Load tunnel state."""
+        try:
+            rows = await self._fetch(
+                "SELECT state_json FROM tunnels WHERE id = ? AND state_json IS NOT NULL",
+                (tunnel_id,),
+            )
+            if not rows:
+                return None
+            return TunnelState.model_validate_json(rows[0][0])
+
+        except Exception as e:
+            raise StorageError(f"Failed to load state: {e}") from e
+
+    async def delete_tunnel(self, tunnel_id: str) -> None:
+        """Delete tunnel data."""
+        try:
+            await self._execute("DELETE FROM tunnels WHERE id = ?", (tunnel_id,))
+        except Exception as e:
+            raise StorageError(f"Failed to delete tunnel: {e}") from e
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        await asyncio.to_thread(self._close)
+
+    async def _execute(self, sql: str, params: tuple[Any, ...] = ()) -> None:
+        """Run a write statement in its own transaction."""
+
+        def execute(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.execute(sql, params)
+
+        await asyncio.to_thread(self._run, execute)
+
+    async def _fetch(self, sql: str, params: tuple[Any, ...] = ()) -> list[Any]:
+        """Run a query and return all of its rows."""
+        return await asyncio.to_thread(
+            self._run, lambda conn: conn.execute(sql, params).fetchall()
+        )
+
+    def _run[T](self, operation: Callable[[sqlite3.Connection], T]) -> T:
+        """Run an operation on the shared connection, opening it if needed."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            return operation(self._conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and make sure the schema exists."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            with conn:
+                conn.execute(_SCHEMA)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _close(self) -> None:
+        """Close the shared connection once no query is using it."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
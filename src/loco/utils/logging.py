@@ -6,6 +6,25 @@ import logging
 import sys
 from typing import TextIO
 
+_SILENT = logging.CRITICAL + 1
+
+_FORMATTER = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+_NOISY_LOGGERS = (
+    "aiohttp",
+    "aiohttp.access",
+    "aiohttp.client",
+    "aiohttp.server",
+    "asyncio",
+    "urllib3",
+    "requests",
+)
+
+# Set once the "loco" logger has its default level and handler, after which
+# get_logger is a plain logging.getLogger lookup.
+_configured = False
+_noisy_silenced = False
+
 
 def get_logger(name: str = "loco") -> logging.Logger:
     """
@@ -17,22 +36,19 @@ def get_logger(name: str = "loco") -> logging.Logger:
     Returns:
         A logger instance.
     """
-    logger = logging.getLogger(name)
-    if not logger.hasHandlers():
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.CRITICAL + 1)  # Silent by default
-
-    return logger
-
-
-def setup_logging(
-    level: int = logging.CRITICAL + 1, stream: TextIO = sys.stderr
-) -> None:
+    global _configured  # noqa: PLW0603
+    if not _configured:
+        # Module loggers inherit their level and handlers from "loco", which
+        # is silent until setup_logging installs a real handler.
+        loco_logger = logging.getLogger("loco")
+        loco_logger.addHandler(logging.NullHandler())
+        loco_logger.setLevel(_SILENT)
+        _configured = True
+
+    return logging.getLogger(name)
+
+
+def setup_logging(level: int = _SILENT, stream: TextIO = sys.stderr) -> None:
     """
     Set up the logging configuration.
 
@@ -40,32 +56,29 @@ def setup_logging(
         level: The logging level. Defaults to CRITICAL + 1 (silent).
         stream: The stream to write logs to. Defaults to sys.stderr.
     """
+    global _configured, _noisy_silenced  # noqa: PLW0603
     loco_logger = logging.getLogger("loco")
-    loco_logger.setLevel(level)
-
-    for handler in loco_logger.handlers[:]:
-        loco_logger.removeHandler(handler)
-
-    if level <= logging.CRITICAL:
-        handler = logging.StreamHandler(stream)
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        handler.setLevel(level)
-        loco_logger.addHandler(handler)
-
-    noisy_loggers = [
-        "aiohttp",
-        "aiohttp.access",
-        "aiohttp.client",
-        "aiohttp.server",
-        "asyncio",
-        "urllib3",
-        "requests",
-    ]
-
-    for logger_name in noisy_loggers:
-        logging.getLogger(logger_name).setLevel(logging.CRITICAL + 1)
-
-    loco_logger.propagate = False
+
+    # The silent default is what get_logger already installed, so there is
+    # nothing to rebuild unless an earlier call turned output on.
+    already_silent = _configured and loco_logger.level == _SILENT
+    _configured = True
+
+    if not (level > logging.CRITICAL and already_silent):
+        loco_logger.setLevel(level)
+
+        for handler in loco_logger.handlers[:]:
+            loco_logger.removeHandler(handler)
+
+        if level <= logging.CRITICAL:
+            handler = logging.StreamHandler(stream)
+            handler.setFormatter(_FORMATTER)
+            handler.setLevel(level)
+            loco_logger.addHandler(handler)
+
+        loco_logger.propagate = False
+
+    if not _noisy_silenced:
+        for logger_name in _NOISY_LOGGERS:
+            logging.getLogger(logger_name).setLevel(_SILENT)
+        _noisy_silenced = True
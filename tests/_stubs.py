@@ -0,0 +1,40 @@
+"""Lightweight test doubles shared by the unit tests."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from loco.core.models import TunnelState
+
+if TYPE_CHECKING:
+    from loco.core.models import TunnelConfig
+
+
+@dataclass
+class StubTunnel:
+    """
+    Minimal stand-in for Tunnel.\n
+    Cheaper to build than a MagicMock tree, and records how often it was
+    started and stopped.
+    """
+
+    config: TunnelConfig
+    state: TunnelState = field(init=False)
+    active: bool = False
+    start_calls: int = 0
+    stop_calls: int = 0
+
+    def __post_init__(self) -> None:
+        self.state = TunnelState(config=self.config)
+
+    async def start(self) -> None:
+        self.start_calls += 1
+        self.active = True
+
+    async def stop(self) -> None:
+        self.stop_calls += 1
+        self.active = False
+
+    def is_active(self) -> bool:
+        return self.active
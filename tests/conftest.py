@@ -1,3 +1,4 @@
+import socket
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -14,6 +15,14 @@ def temp_dir(tmp_path):
     return tmp_path
 
 
+@pytest.fixture
+def free_port() -> int:
+    """Get a local TCP port that is currently free to bind."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
 @pytest.fixture
 def file_storage(temp_dir) -> FileStorage:
     """Create a FileStorage instance using the temporary directory."""
@@ -22,9 +31,13 @@ def file_storage(temp_dir) -> FileStorage:
     return FileStorage(base_dir=temp_dir)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_tunnel_config() -> TunnelConfig:
-    """Create a sample TunnelConfig for testing."""
+    """
+    Create a sample TunnelConfig for testing.\n
+    TunnelConfig is frozen, so one instance is shared by the whole session;
+    tests derive variants with model_copy.
+    """
     return TunnelConfig(
         tunnel_id="test-tunnel-id",
         name="Test Tunnel",
@@ -42,7 +55,7 @@ def sample_tunnel_config() -> TunnelConfig:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_tunnel_config_tcp():
     return TunnelConfig(
         tunnel_id="test-proxy",
@@ -1,10 +1,10 @@
 import json
 from unittest.mock import patch
 
-import aiofiles
 import pytest
 
 from loco.core.exceptions import StorageError
+from loco.storage import file_storage as file_storage_module
 from loco.storage.file_storage import FileStorage
 
 
@@ -18,6 +18,14 @@ class TestFileStorage:
         assert storage.config_dir.exists()
         assert storage.state_dir.exists()
 
+    def test_init_creates_directories_once(self, temp_dir):
+        """Test that later instances skip creating already-created directories."""
+        FileStorage(base_dir=temp_dir)
+
+        with patch("pathlib.Path.mkdir") as mock_mkdir:
+            FileStorage(base_dir=temp_dir)
+            mock_mkdir.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_save_tunnel_config(self, file_storage, sample_tunnel_config):
         """Test saving a tunnel configuration."""
@@ -26,11 +34,12 @@ class TestFileStorage:
         config_path = file_storage.config_dir / f"{sample_tunnel_config.tunnel_id}.json"
         assert config_path.exists()
 
-        async with aiofiles.open(config_path, "r") as f:
-            content = await f.read()
-            saved_config = json.loads(content)
-            assert saved_config["tunnel_id"] == sample_tunnel_config.tunnel_id
-            assert saved_config["name"] == sample_tunnel_config.name
+        content = config_path.read_text()
+        assert "\n" not in content
+
+        saved_config = json.loads(content)
+        assert saved_config["tunnel_id"] == sample_tunnel_config.tunnel_id
+        assert saved_config["name"] == sample_tunnel_config.name
 
     @pytest.mark.asyncio
     async def test_load_tunnel_config(self, file_storage, sample_tunnel_config):
@@ -79,11 +88,29 @@ class TestFileStorage:
         )
         assert state_path.exists()
 
-        async with aiofiles.open(state_path, "r") as f:
-            content = await f.read()
-            saved_state = json.loads(content)
-            assert saved_state["status"] == sample_tunnel_state.status.value
-            assert saved_state["public_url"] == sample_tunnel_state.public_url
+        saved_state = json.loads(state_path.read_text())
+        assert saved_state["status"] == sample_tunnel_state.status.value
+        assert saved_state["public_url"] == sample_tunnel_state.public_url
+
+    @pytest.mark.asyncio
+    async def test_save_tunnel_state_skips_unchanged(
+        self, file_storage, sample_tunnel_state
+    ):
+        """Test that saving an unchanged state does not rewrite the file."""
+        await file_storage.save_tunnel_state(sample_tunnel_state)
+
+        with patch.object(file_storage_module, "_atomic_write_text") as mock_write:
+            await file_storage.save_tunnel_state(sample_tunnel_state)
+            mock_write.assert_not_called()
+
+        sample_tunnel_state.active_connections = 3
+        await file_storage.save_tunnel_state(sample_tunnel_state)
+
+        loaded = await file_storage.load_tunnel_state(
+            sample_tunnel_state.config.tunnel_id
+        )
+        assert loaded is not None
+        assert loaded.active_connections == 3
 
     @pytest.mark.asyncio
     async def test_load_tunnel_state(self, file_storage, sample_tunnel_state):
@@ -132,19 +159,32 @@ class TestFileStorage:
     @pytest.mark.asyncio
     async def test_save_config_storage_error(self, file_storage, sample_tunnel_config):
         """Test storage error during config save."""
-        with patch("aiofiles.open", side_effect=Exception("Mocked error")):
+        with patch("pathlib.Path.replace", side_effect=Exception("Mocked error")):
             with pytest.raises(StorageError) as exc_info:
                 await file_storage.save_tunnel_config(sample_tunnel_config)
 
             assert "Failed to save tunnel config" in str(exc_info.value)
 
+        assert list(file_storage.config_dir.iterdir()) == []
+
     @pytest.mark.asyncio
     async def test_load_config_storage_error(self, file_storage, sample_tunnel_config):
         """Test storage error during config load."""
         await file_storage.save_tunnel_config(sample_tunnel_config)
 
-        with patch("aiofiles.open", side_effect=Exception("Mocked error")):
+        with patch("pathlib.Path.read_bytes", side_effect=Exception("Mocked error")):
             with pytest.raises(StorageError) as exc_info:
                 await file_storage.load_tunnel_config(sample_tunnel_config.tunnel_id)
 
             assert "Failed to load config" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_close_is_noop(self, file_storage, sample_tunnel_config):
+        """Test closing file storage leaves it usable."""
+        await file_storage.close()
+        await file_storage.save_tunnel_config(sample_tunnel_config)
+
+        assert (
+            await file_storage.load_tunnel_config(sample_tunnel_config.tunnel_id)
+            == sample_tunnel_config
+        )
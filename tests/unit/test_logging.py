@@ -0,0 +1,41 @@
+import io
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from loco.utils.logging import get_logger, setup_logging
+
+
+@pytest.mark.unit
+class TestLogging:
+    def test_module_loggers_are_silent_by_default(self):
+        """Test module loggers inherit the silent default from the loco logger."""
+        logger = get_logger("loco.tests.default")
+
+        assert not logger.handlers
+        assert not logger.isEnabledFor(logging.CRITICAL)
+
+    def test_setup_logging_enables_module_loggers(self):
+        """Test module loggers created before setup_logging follow its level."""
+        logger = get_logger("loco.tests.verbose")
+        stream = io.StringIO()
+
+        try:
+            setup_logging(logging.DEBUG, stream=stream)
+            logger.debug("hello")
+        finally:
+            setup_logging()
+
+        assert "loco.tests.verbose - DEBUG - hello" in stream.getvalue()
+        assert not logger.isEnabledFor(logging.CRITICAL)
+
+    def test_silent_setup_is_a_no_op_when_already_silent(self):
+        """Test repeated silent setup skips reconfiguring any logger."""
+        setup_logging()
+        assert not logging.getLogger("aiohttp").isEnabledFor(logging.CRITICAL)
+
+        with patch("logging.getLogger", wraps=logging.getLogger) as mock_get_logger:
+            setup_logging()
+
+        mock_get_logger.assert_called_once_with("loco")
@@ -1,10 +1,18 @@
+import asyncio
 from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from loco.core.exceptions import TunnelError, TunnelNotFoundError
+from loco.core.exceptions import StorageError, TunnelError, TunnelNotFoundError
 from loco.core.models import TunnelConfig, TunnelProtocol, TunnelState, TunnelStatus
+from loco.network.manager import (
+    TunnelManager,
+    close_manager,
+    get_manager,
+    set_storage_backend,
+)
+from tests._stubs import StubTunnel
 
 
 @pytest.mark.unit
@@ -26,6 +34,39 @@ class TestTunnelManager:
 
         mock_storage.list_tunnel_configs.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_load_from_storage_repairs_states(
+        self, tunnel_manager, mock_storage, sample_tunnel_config, sample_tunnel_state
+    ):
+        """Test that stale running states are stopped and failed loads skipped."""
+        other_config = sample_tunnel_config.model_copy(
+            update={"tunnel_id": "test-other-id"}
+        )
+        mock_storage.list_tunnel_configs.return_value = [
+            sample_tunnel_config,
+            other_config,
+        ]
+        mock_storage.load_tunnel_state.side_effect = [
+            sample_tunnel_state,
+            StorageError("corrupt"),
+        ]
+
+        await tunnel_manager.load_from_storage()
+
+        assert set(tunnel_manager._tunnels) == {"test-tunnel-id", "test-other-id"}
+        assert sample_tunnel_state.status == TunnelStatus.STOPPED
+        mock_storage.save_tunnel_state.assert_called_once_with(sample_tunnel_state)
+
+    @pytest.mark.asyncio
+    async def test_ensure_loaded_loads_once(self, tunnel_manager, mock_storage):
+        """Test that concurrent and repeated loads hit storage only once."""
+        await asyncio.gather(
+            tunnel_manager.ensure_loaded(), tunnel_manager.ensure_loaded()
+        )
+        await tunnel_manager.list_tunnels()
+
+        mock_storage.list_tunnel_configs.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_create_tunnel(self, tunnel_manager):
         """Test creating a new tunnel."""
@@ -87,9 +128,6 @@ class TestTunnelManager:
     @pytest.mark.asyncio
     async def test_list_tunnels(self, tunnel_manager):
         """Test listing all tunnels."""
-        mock_tunnel1 = MagicMock()
-        mock_tunnel2 = MagicMock()
-
         config1 = TunnelConfig(
             tunnel_id="test-id-1",
             name="Test1",
@@ -144,22 +182,18 @@ class TestTunnelManager:
             total_connections=1,
         )
 
-        mock_tunnel1.state = state1
-        mock_tunnel1.is_active.return_value = True
-        mock_tunnel1.config = config1
+        tunnel1 = StubTunnel(config1, active=True)
+        tunnel1.state = state1
+        tunnel2 = StubTunnel(config2)
+        tunnel2.state = state2
 
-        mock_tunnel2.state = state2
-        mock_tunnel2.is_active.return_value = False
-        mock_tunnel2.config = config2
+        tunnel_manager._tunnels = {"test-id-1": tunnel1, "test-id-2": tunnel2}
 
-        tunnel_manager._tunnels = {
-            "test-id-1": mock_tunnel1,
-            "test-id-2": mock_tunnel2,
-        }
-
-        with patch.object(tunnel_manager, "sync_tunnel_state"):
+        with patch.object(tunnel_manager, "sync_tunnel_state") as mock_sync:
             result = await tunnel_manager.list_tunnels()
 
+            mock_sync.assert_called_once_with("test-id-1")
+
             assert len(result) == 2
             tunnel_ids_and_statuses = [
                 {"tunnel_id": r.config.tunnel_id, "status": r.status} for r in result
@@ -174,48 +208,38 @@ class TestTunnelManager:
             } in tunnel_ids_and_statuses
 
     @pytest.mark.asyncio
-    async def test_start_tunnel(self, tunnel_manager):
+    async def test_start_tunnel(self, tunnel_manager, sample_tunnel_config):
         """Test starting a tunnel."""
-        mock_tunnel = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.tunnel_id = "test-id"
-        mock_tunnel.config = mock_config
-
-        tunnel_manager._tunnels = {"test-id": mock_tunnel}
+        tunnel = StubTunnel(sample_tunnel_config)
+        tunnel_manager._tunnels = {"test-tunnel-id": tunnel}
 
         with patch.object(tunnel_manager, "sync_tunnel_state"):
-            await tunnel_manager.start_tunnel("test-id")
-            mock_tunnel.start.assert_called_once()
+            await tunnel_manager.start_tunnel("test-tunnel-id")
+
+        assert tunnel.start_calls == 1
 
     @pytest.mark.asyncio
-    async def test_stop_tunnel(self, tunnel_manager):
+    async def test_stop_tunnel(self, tunnel_manager, sample_tunnel_config):
         """Test stopping a tunnel."""
-        mock_tunnel = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.tunnel_id = "test-id"
-        mock_tunnel.config = mock_config
-
-        tunnel_manager._tunnels = {"test-id": mock_tunnel}
+        tunnel = StubTunnel(sample_tunnel_config, active=True)
+        tunnel_manager._tunnels = {"test-tunnel-id": tunnel}
 
         with patch.object(tunnel_manager, "sync_tunnel_state"):
-            await tunnel_manager.stop_tunnel("test-id")
-            mock_tunnel.stop.assert_called_once()
+            await tunnel_manager.stop_tunnel("test-tunnel-id")
+
+        assert tunnel.stop_calls == 1
 
     @pytest.mark.asyncio
-    async def test_remove_tunnel(self, tunnel_manager):
+    async def test_remove_tunnel(self, tunnel_manager, sample_tunnel_config):
         """Test removing a tunnel."""
-        mock_tunnel = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.tunnel_id = "test-id"
-        mock_tunnel.config = mock_config
-        mock_tunnel.is_active = MagicMock(return_value=False)
+        tunnel = StubTunnel(sample_tunnel_config)
+        tunnel_manager._tunnels = {"test-tunnel-id": tunnel}
 
-        tunnel_manager._tunnels = {"test-id": mock_tunnel}
-
-        await tunnel_manager.remove_tunnel("test-id")
+        await tunnel_manager.remove_tunnel("test-tunnel-id")
 
-        tunnel_manager.storage.delete_tunnel.assert_called_once_with("test-id")
-        assert "test-id" not in tunnel_manager._tunnels
+        tunnel_manager.storage.delete_tunnel.assert_called_once_with("test-tunnel-id")
+        assert "test-tunnel-id" not in tunnel_manager._tunnels
+        assert tunnel.stop_calls == 0
 
     @pytest.mark.asyncio
     async def test_get_tunnel_status(self, tunnel_manager):
@@ -254,6 +278,17 @@ class TestTunnelManager:
             assert stats == expected_stats
             mock_tunnel.get_stats.assert_called_once()
 
+    def test_get_many_stats(self, tunnel_manager):
+        """Test getting stats for several tunnels at once."""
+        mock_tunnel = MagicMock()
+        mock_tunnel.get_stats.return_value = {"active_connections": 2}
+
+        tunnel_manager._tunnels = {"test-id": mock_tunnel}
+
+        stats = tunnel_manager.get_many_stats(["test-id", "missing-id"])
+
+        assert stats == {"test-id": {"active_connections": 2}}
+
     @pytest.mark.asyncio
     async def test_cleanup_stopped_tunnels(self, tunnel_manager):
         """Test cleaning up stopped tunnels."""
@@ -283,28 +318,28 @@ class TestTunnelManager:
             mock_remove.assert_called_once_with("test-id-1")
 
     @pytest.mark.asyncio
-    async def test_stop_all_tunnels(self, tunnel_manager):
+    async def test_stop_all_tunnels(self, tunnel_manager, sample_tunnel_config):
         """Test stopping all tunnels."""
-        mock_tunnel1 = AsyncMock()
-        mock_config1 = MagicMock()
-        mock_tunnel1.config = mock_config1
-        mock_tunnel1.is_active = MagicMock(return_value=True)
-
-        mock_tunnel2 = AsyncMock()
-        mock_config2 = MagicMock()
-        mock_config2.tunnel_id = "test-id-2"
-        mock_tunnel2.config = mock_config2
-        mock_tunnel2.is_active = MagicMock(return_value=True)
+        tunnel1 = StubTunnel(sample_tunnel_config, active=True)
+        tunnel2 = StubTunnel(
+            sample_tunnel_config.model_copy(update={"tunnel_id": "test-id-2"}),
+            active=True,
+        )
+        tunnel3 = StubTunnel(
+            sample_tunnel_config.model_copy(update={"tunnel_id": "test-id-3"})
+        )
 
         tunnel_manager._tunnels = {
-            "test-id-1": mock_tunnel1,
-            "test-id-2": mock_tunnel2,
+            "test-tunnel-id": tunnel1,
+            "test-id-2": tunnel2,
+            "test-id-3": tunnel3,
         }
 
         await tunnel_manager.stop_all_tunnels()
 
-        mock_tunnel1.stop.assert_called_once()
-        mock_tunnel2.stop.assert_called_once()
+        assert tunnel1.stop_calls == 1
+        assert tunnel2.stop_calls == 1
+        assert tunnel3.stop_calls == 0
 
     @pytest.mark.asyncio
     async def test_sync_tunnel_state(self, tunnel_manager):
@@ -324,3 +359,133 @@ class TestTunnelManager:
         tunnel_manager.storage.save_tunnel_state.assert_called_once_with(
             mock_tunnel.state
         )
+
+    def test_get_manager_returns_shared_instance(self, mock_storage):
+        """Test that get_manager memoizes a single manager per process."""
+        with (
+            patch("loco.network.manager._manager", None),
+            patch("loco.network.manager.FileStorage", return_value=mock_storage),
+        ):
+            first = get_manager()
+            second = get_manager()
+
+            assert first is second
+            assert first.storage == mock_storage
+
+    @pytest.mark.asyncio
+    async def test_get_manager_uses_selected_backend(self):
+        """Test the selected storage backend is built and closed with the manager."""
+        with (
+            patch("loco.network.manager._manager", None),
+            patch("loco.network.manager._storage_backend", "file"),
+            patch("loco.network.manager.SqliteStorage") as mock_sqlite,
+        ):
+            mock_sqlite.return_value.close = AsyncMock()
+            set_storage_backend("sqlite")
+            manager = get_manager()
+            await close_manager()
+
+        assert manager.storage is mock_sqlite.return_value
+        mock_sqlite.return_value.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_stopped_tunnels_with_ids(self, tunnel_manager):
+        """Test failed removals of pre-selected tunnels are raised together."""
+        with patch.object(
+            tunnel_manager,
+            "remove_tunnel",
+            side_effect=[None, TunnelNotFoundError("gone")],
+        ) as mock_remove:
+            with pytest.raises(TunnelError) as exc_info:
+                await tunnel_manager.cleanup_stopped_tunnels(
+                    ["test-id-1", "test-id-2"]
+                )
+
+            assert mock_remove.call_count == 2
+
+        message = str(exc_info.value)
+        assert "Cleaned up 1 of 2 tunnel(s)" in message
+        assert "test-id-2: gone" in message
+
+    @pytest.mark.asyncio
+    async def test_find_by_prefix(self, tunnel_manager, sample_tunnel_config):
+        """Test finding tunnels by ID prefix and by name."""
+        other_config = sample_tunnel_config.model_copy(
+            update={"tunnel_id": "test-other-id", "name": "Other"}
+        )
+        await tunnel_manager.create_tunnel(sample_tunnel_config)
+        await tunnel_manager.create_tunnel(other_config)
+
+        assert len(tunnel_manager.find_by_prefix("test-")) == 2
+        assert [
+            s.config.tunnel_id for s in tunnel_manager.find_by_prefix("test-t")
+        ] == ["test-tunnel-id"]
+        assert [
+            s.config.tunnel_id for s in tunnel_manager.find_by_prefix("other")
+        ] == ["test-other-id"]
+        assert tunnel_manager.find_by_prefix("missing") == []
+
+        await tunnel_manager.remove_tunnel("test-tunnel-id")
+
+        assert tunnel_manager.find_by_prefix("test-t") == []
+
+    @pytest.mark.asyncio
+    async def test_find_by_name_of_renamed_copy(
+        self, tunnel_manager, sample_tunnel_config
+    ):
+        """Test a config copied with a new name only matches the new name."""
+        renamed = sample_tunnel_config.model_copy(
+            update={"tunnel_id": "renamed-id", "name": "Renamed"}
+        )
+        await tunnel_manager.create_tunnel(renamed)
+
+        assert tunnel_manager.find_by_prefix("test tunnel") == []
+        assert [
+            s.config.tunnel_id for s in tunnel_manager.find_by_prefix("renamed")
+        ] == ["renamed-id"]
+
+    @pytest.mark.asyncio
+    async def test_find_by_name_of_loaded_tunnel(
+        self, tunnel_manager, sample_tunnel_config
+    ):
+        """Test tunnels loaded from storage are matched by name until removed."""
+        tunnel_manager.storage.list_tunnel_configs.return_value = [
+            sample_tunnel_config
+        ]
+        tunnel_manager.storage.load_tunnel_state.return_value = None
+
+        await tunnel_manager.load_from_storage()
+
+        assert [
+            s.config.tunnel_id for s in tunnel_manager.find_by_prefix("TUNNEL")
+        ] == [sample_tunnel_config.tunnel_id]
+
+        await tunnel_manager.remove_tunnel(sample_tunnel_config.tunnel_id)
+
+        assert tunnel_manager._names_lower == {}
+
+    async def test_find_by_prefix_of_legacy_dashed_id(
+        self, file_storage, sample_tunnel_config
+    ):
+        """Test tunnels saved with dashed UUID IDs still resolve by prefix."""
+        legacy = sample_tunnel_config.model_copy(
+            update={"tunnel_id": "1b4e28ba-2fa1-11d2-883f-0016d3cca427"}
+        )
+        current = sample_tunnel_config.model_copy(
+            update={"tunnel_id": "9f1c0d2e4b7a4c1e8d3f5a6b7c8d9e0f", "name": "other"}
+        )
+        await file_storage.save_tunnel_config(legacy)
+        await file_storage.save_tunnel_config(current)
+
+        with patch("loco.network.manager.FileStorage", return_value=file_storage):
+            manager = TunnelManager()
+        await manager.load_from_storage()
+
+        for query in ("1b4e28ba", "1b4e28ba-2fa1", legacy.tunnel_id):
+            assert [
+                s.config.tunnel_id for s in manager.find_by_prefix(query)
+            ] == [legacy.tunnel_id]
+        assert manager.get_tunnel("1b4e28ba").config.tunnel_id == legacy.tunnel_id
+        assert [
+            s.config.tunnel_id for s in manager.find_by_prefix("9f1c0d2e")
+        ] == [current.tunnel_id]
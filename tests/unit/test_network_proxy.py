@@ -1,10 +1,20 @@
 import asyncio
+import contextlib
 import socket
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from loco.network.proxy import TunnelProxy
+from loco.network.proxy import TunnelProxy, _PipeProtocol
+
+
+async def _open_connection_with_retry(host, port):
+    for _ in range(50):
+        try:
+            return await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(0.01)
+    return await asyncio.open_connection(host, port)
 
 
 @pytest.mark.unit
@@ -14,7 +24,7 @@ class TestTunnelProxy:
         proxy = TunnelProxy(config=sample_tunnel_config_tcp)
 
         assert proxy.config == sample_tunnel_config_tcp
-        assert proxy._server_socket is None
+        assert proxy._server is None
         assert proxy.on_data_transfer is None
         assert proxy._connections == set()
 
@@ -23,60 +33,38 @@ class TestTunnelProxy:
         """Test starting the proxy server."""
         proxy = TunnelProxy(config=sample_tunnel_config_tcp)
 
-        mock_socket = MagicMock(spec=socket.socket)
-        mock_loop = AsyncMock(spec=asyncio.AbstractEventLoop)
-
-        mock_client_socket = MagicMock(spec=socket.socket)
-        mock_client_addr = ("192.168.1.1", 12345)
-
-        mock_loop.sock_accept.side_effect = [
-            (mock_client_socket, mock_client_addr),
-            asyncio.CancelledError(),
-        ]
+        mock_server = AsyncMock(spec=asyncio.Server)
+        mock_server.serve_forever.side_effect = asyncio.CancelledError()
+        loop = asyncio.get_running_loop()
 
         with (
-            patch("socket.socket", return_value=mock_socket) as mock_socket_class,
-            patch("asyncio.get_event_loop", return_value=mock_loop),
-            patch.object(proxy, "_handle_tcp_connection") as mock_handle_conn,
+            patch.object(
+                loop, "create_server", AsyncMock(return_value=mock_server)
+            ) as mock_create_server,
+            pytest.raises(asyncio.CancelledError),
         ):
-            real_task = MagicMock()
-            real_task.add_done_callback = MagicMock()
-
-            def fake_create_task(coro):
-                proxy._connections.add(real_task)
-                return real_task
-
-            mock_loop.create_task = fake_create_task
-
-            mock_handle_conn.return_value = None
-
-            with patch("contextlib.suppress"):
-                await proxy.start()
-
-            mock_socket_class.assert_called_once_with(
-                socket.AF_INET, socket.SOCK_STREAM
-            )
-            mock_socket.setsockopt.assert_called_once_with(
-                socket.SOL_SOCKET, socket.SO_REUSEADDR, 1
-            )
-            mock_socket.bind.assert_called_once_with(
-                (
-                    sample_tunnel_config_tcp.remote_host,
-                    sample_tunnel_config_tcp.remote_port,
-                )
-            )
-            mock_socket.listen.assert_called_once()
-            mock_socket.setblocking.assert_called_once_with(False)
-
-            mock_loop.sock_accept.assert_called()
-            assert len(proxy._connections) == 1
+            await proxy.start()
+
+        mock_create_server.assert_called_once_with(
+            proxy._create_client_protocol,
+            sample_tunnel_config_tcp.remote_host,
+            sample_tunnel_config_tcp.remote_port,
+            family=socket.AF_INET,
+            backlog=sample_tunnel_config_tcp.max_connections,
+            reuse_address=True,
+        )
+        mock_server.serve_forever.assert_called_once()
+        assert proxy._server is mock_server
+        assert proxy.is_running()
 
     @pytest.mark.asyncio
     async def test_stop(self, sample_tunnel_config_tcp):
         """Test stopping the proxy server."""
         proxy = TunnelProxy(config=sample_tunnel_config_tcp)
 
-        proxy._server_socket = MagicMock(spec=socket.socket)
+        mock_server = MagicMock(spec=asyncio.Server)
+        mock_server.wait_closed = AsyncMock()
+        proxy._server = mock_server
 
         async def dummy_task():
             return None
@@ -100,93 +88,252 @@ class TestTunnelProxy:
         task1.cancel.assert_called_once()
         task2.cancel.assert_not_called()
 
-        assert proxy._server_socket is None
+        mock_server.close.assert_called_once()
+        mock_server.wait_closed.assert_awaited_once()
+        assert proxy._server is None
 
         assert proxy._connections == set()
 
     @pytest.mark.asyncio
-    async def test_handle_tcp_connection(self, sample_tunnel_config_tcp):
-        """Test TCP connection handling."""
-        proxy = TunnelProxy(config=sample_tunnel_config_tcp)
-        proxy._running = True
-
-        mock_client_socket = MagicMock(spec=socket.socket)
-        mock_local_socket = MagicMock(spec=socket.socket)
-        mock_client_addr = ("192.168.1.1", 12345)
-
-        mock_loop = AsyncMock(spec=asyncio.AbstractEventLoop)
+    async def test_proxy_tcp_connection(self, sample_tunnel_config_tcp, free_port):
+        """Test piping a TCP connection to the local service and back."""
+
+        async def echo(reader, writer):
+            writer.write(await reader.read(1024))
+            await writer.drain()
+            writer.close()
+
+        local_server = await asyncio.start_server(echo, "127.0.0.1", 0)
+        local_port = local_server.sockets[0].getsockname()[1]
+        config = sample_tunnel_config_tcp.model_copy(
+            update={
+                "local_host": "127.0.0.1",
+                "local_port": local_port,
+                "remote_host": "127.0.0.1",
+                "remote_port": free_port,
+            }
+        )
+
+        transferred = []
+        proxy = TunnelProxy(config=config, on_data_transfer=transferred.append)
+
+        async with local_server:
+            proxy_task = asyncio.create_task(proxy.start())
+            reader, writer = await _open_connection_with_retry(
+                "127.0.0.1", config.remote_port
+            )
 
-        with (
-            patch("socket.socket", return_value=mock_local_socket) as mock_socket_class,
-            patch("asyncio.get_event_loop", return_value=mock_loop),
-            patch("asyncio.create_task") as mock_create_task,
-            patch("asyncio.wait") as mock_wait,
-        ):
-            task1 = AsyncMock(spec=asyncio.Task)
-            task2 = AsyncMock(spec=asyncio.Task)
-            mock_create_task.side_effect = [task1, task2]
+            writer.write(b"test data")
+            reply = await asyncio.wait_for(reader.read(1024), 5)
+            writer.write_eof()
+            await asyncio.wait_for(reader.read(), 5)
+            writer.close()
 
-            mock_wait.return_value = (set(), {task2})
+            proxy_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await proxy_task
+            await proxy.stop()
 
-            await proxy._handle_tcp_connection(mock_client_socket, mock_client_addr)
+        assert reply == b"test data"
+        assert transferred == [len(b"test data"), len(b"test data")]
 
-            mock_socket_class.assert_called_once_with(
-                socket.AF_INET, socket.SOCK_STREAM
-            )
-            mock_loop.sock_connect.assert_called_once_with(
-                mock_local_socket,
-                (
-                    sample_tunnel_config_tcp.local_host,
-                    sample_tunnel_config_tcp.local_port,
-                ),
+    @pytest.mark.asyncio
+    async def test_local_connections_limited(self, sample_tunnel_config_tcp, free_port):
+        """Test clients beyond max_connections wait for a free local connection."""
+        active = 0
+        peak = 0
+
+        async def echo(reader, writer):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            while data := await reader.read(1024):
+                writer.write(data)
+                await writer.drain()
+            active -= 1
+            writer.close()
+
+        local_server = await asyncio.start_server(echo, "127.0.0.1", 0)
+        config = sample_tunnel_config_tcp.model_copy(
+            update={
+                "local_host": "127.0.0.1",
+                "local_port": local_server.sockets[0].getsockname()[1],
+                "remote_host": "127.0.0.1",
+                "remote_port": free_port,
+                "max_connections": 1,
+            }
+        )
+        proxy = TunnelProxy(config=config)
+
+        async with local_server:
+            proxy_task = asyncio.create_task(proxy.start())
+            reader1, writer1 = await _open_connection_with_retry(
+                "127.0.0.1", config.remote_port
             )
+            writer2 = None
+            try:
+                writer1.write(b"first")
+                assert await asyncio.wait_for(reader1.read(1024), 5) == b"first"
 
-            assert mock_create_task.call_count == 2
-
-            task2.cancel.assert_called_once()
+                reader2, writer2 = await asyncio.open_connection(
+                    "127.0.0.1", config.remote_port
+                )
+                writer2.write(b"second")
+                with pytest.raises(TimeoutError):
+                    await asyncio.wait_for(reader2.read(1024), 0.2)
+
+                writer1.close()
+                assert await asyncio.wait_for(reader2.read(1024), 5) == b"second"
+            finally:
+                writer1.close()
+                if writer2 is not None:
+                    writer2.close()
+                proxy_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await proxy_task
+                await proxy.stop()
+
+        assert peak == 1
 
-            mock_client_socket.close.assert_called_once()
-            mock_local_socket.close.assert_called_once()
+    @pytest.mark.asyncio
+    async def test_stop_while_clients_connect(
+        self, sample_tunnel_config_tcp, free_port
+    ):
+        """Test stop finishes when clients are accepted while it runs."""
+
+        async def echo(reader, writer):
+            while data := await reader.read(1024):
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        local_server = await asyncio.start_server(echo, "127.0.0.1", 0)
+        config = sample_tunnel_config_tcp.model_copy(
+            update={
+                "local_host": "127.0.0.1",
+                "local_port": local_server.sockets[0].getsockname()[1],
+                "remote_host": "127.0.0.1",
+                "remote_port": free_port,
+            }
+        )
+        proxy = TunnelProxy(config=config)
+        writers = []
+
+        async def connect_until_refused():
+            while True:
+                try:
+                    _, writer = await asyncio.open_connection(
+                        "127.0.0.1", config.remote_port
+                    )
+                except OSError:
+                    return
+                writers.append(writer)
+
+        async with local_server:
+            proxy_task = asyncio.create_task(proxy.start())
+            await _open_connection_with_retry("127.0.0.1", config.remote_port)
+            clients = [asyncio.create_task(connect_until_refused()) for _ in range(8)]
+            try:
+                while len(writers) < 20:
+                    await asyncio.sleep(0.01)
+
+                await asyncio.wait_for(proxy.stop(), 5)
+                await asyncio.wait_for(asyncio.gather(*clients), 5)
+
+                assert proxy.get_connection_count() == 0
+            finally:
+                for client in clients:
+                    client.cancel()
+                for writer in writers:
+                    writer.close()
+                proxy_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await proxy_task
 
     @pytest.mark.asyncio
-    async def test_forward_data(self, sample_tunnel_config_tcp):
-        """Test data forwarding between sockets."""
+    async def test_handle_tcp_connection_refused(self, sample_tunnel_config_tcp):
+        """Test that the client transport is closed when the local service is down."""
         proxy = TunnelProxy(config=sample_tunnel_config_tcp)
         proxy._running = True
+        client_transport = MagicMock(spec=asyncio.Transport)
+        client_transport.get_extra_info.return_value = ("192.168.1.1", 12345)
+        client_protocol = _PipeProtocol(
+            asyncio.get_running_loop(),
+            16,
+            None,
+            on_connection_made=proxy._on_client_connected,
+        )
+
+        with patch.object(
+            asyncio.get_running_loop(),
+            "create_connection",
+            side_effect=ConnectionRefusedError("refused"),
+        ):
+            client_protocol.connection_made(client_transport)
+            (task,) = proxy._connections
+            await task
 
-        mock_src_socket = MagicMock(spec=socket.socket)
-        mock_dst_socket = MagicMock(spec=socket.socket)
+        client_transport.close.assert_called_once()
 
-        mock_loop = AsyncMock(spec=asyncio.AbstractEventLoop)
+    @pytest.mark.asyncio
+    async def test_client_closed_when_task_cancelled_early(
+        self, sample_tunnel_config_tcp
+    ):
+        """Test the client is closed when its task is cancelled before running."""
+        proxy = TunnelProxy(config=sample_tunnel_config_tcp)
+        proxy._running = True
+        client_transport = MagicMock(spec=asyncio.Transport)
+        client_protocol = _PipeProtocol(
+            asyncio.get_running_loop(),
+            16,
+            None,
+            on_connection_made=proxy._on_client_connected,
+        )
+
+        client_protocol.connection_made(client_transport)
+        (task,) = proxy._connections
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+        client_transport.close.assert_called_once()
+        assert proxy._connections == set()
 
-        proxy.on_data_transfer = AsyncMock()
+    @pytest.mark.asyncio
+    async def test_pipe_buffer_reuse(self):
+        """Test that the receive buffer is only replaced when data is queued."""
+        loop = asyncio.get_running_loop()
+        source = _PipeProtocol(loop, 16, None)
+        sink = _PipeProtocol(loop, 16, None)
+        source.connection_made(MagicMock(spec=asyncio.Transport))
+        sink_transport = MagicMock(spec=asyncio.Transport)
+        sink.connection_made(sink_transport)
+        source.connect(sink)
 
-        with patch("asyncio.get_event_loop", return_value=mock_loop):
-            mock_loop.sock_recv.side_effect = [b"test data", b""]
+        sink_transport.get_write_buffer_size.return_value = 0
+        buffer = source.get_buffer(-1)
+        buffer[:4] = b"ping"
+        source.buffer_updated(4)
 
-            await proxy._forward_data(mock_src_socket, mock_dst_socket, "test->test")
+        assert bytes(sink_transport.write.call_args.args[0]) == b"ping"
+        assert source.get_buffer(-1) is buffer
 
-            mock_loop.sock_recv.assert_called_with(
-                mock_src_socket, sample_tunnel_config_tcp.buffer_size
-            )
-            mock_loop.sock_sendall.assert_called_once_with(
-                mock_dst_socket, b"test data"
-            )
+        sink_transport.get_write_buffer_size.return_value = 4
+        source.buffer_updated(4)
 
-            proxy.on_data_transfer.assert_called_once_with(len(b"test data"))
+        assert source.get_buffer(-1) is not buffer
 
     def test_get_connection_count(self, sample_tunnel_config_tcp):
         """Test getting active connection count."""
         proxy = TunnelProxy(config=sample_tunnel_config_tcp)
 
         task1 = MagicMock(spec=asyncio.Task)
-        task1.done.return_value = False
-
         task2 = MagicMock(spec=asyncio.Task)
-        task2.done.return_value = True
 
         proxy._connections = {task1, task2}
+        assert proxy.get_connection_count() == 2
 
+        proxy._connections.discard(task2)
         assert proxy.get_connection_count() == 1
 
     def test_is_running(self, sample_tunnel_config_tcp):
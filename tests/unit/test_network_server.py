@@ -1,9 +1,16 @@
+import asyncio
+import errno
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from aiohttp import WSMsgType, web
+from aiohttp import ClientSession, WSMsgType, web
+from aiohttp.test_utils import make_mocked_request
 from aiohttp.web_ws import WebSocketResponse
+from multidict import CIMultiDict
 
+from loco.core.exceptions import TunnelError
+from loco.core.models import TunnelConfig
 from loco.network.server import TunnelServer
 
 
@@ -32,6 +39,7 @@ class TestTunnelServer:
             patch("loco.network.server.web.Application") as mock_app_class,
             patch("loco.network.server.web.AppRunner") as mock_runner_class,
             patch("loco.network.server.web.TCPSite") as mock_site_class,
+            patch("loco.network.server.ClientSession") as mock_session_class,
         ):
             mock_app = MagicMock()
             mock_app_class.return_value = mock_app
@@ -51,12 +59,83 @@ class TestTunnelServer:
             mock_runner.setup.assert_called_once()
             mock_site_class.assert_called_once()
             mock_site.start.assert_called_once()
+            assert mock_session_class.call_args.kwargs["auto_decompress"] is False
+            assert mock_runner_class.call_args.kwargs == {
+                "access_log": None,
+                "handler_cancellation": True,
+            }
 
             assert (
                 "http://localhost:9000"
                 == f"http://localhost:{sample_tunnel_config.remote_port}"
             )
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_is_port_in_use(self, sample_tunnel_config):
+        """Test the port check reports listening and free ports."""
+        server = TunnelServer(config=sample_tunnel_config)
+        listener = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+
+        async with listener:
+            assert await server._is_port_in_use("0.0.0.0", port)
+
+        assert not await server._is_port_in_use("127.0.0.1", port)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_verify_server_running(self, sample_tunnel_config):
+        """Test the startup probe succeeds once the port accepts connections."""
+        listener = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        server = TunnelServer(
+            config=sample_tunnel_config.model_copy(
+                update={"remote_host": "0.0.0.0", "remote_port": port}
+            )
+        )
+
+        async with listener:
+            assert await server._verify_server_running()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_verify_server_not_running(self, sample_tunnel_config, free_port):
+        """Test the startup probe fails after one refused connection."""
+        server = TunnelServer(
+            config=sample_tunnel_config.model_copy(
+                update={"remote_host": "127.0.0.1", "remote_port": free_port}
+            )
+        )
+
+        with patch.object(
+            server, "_can_connect", wraps=server._can_connect
+        ) as mock_connect:
+            assert not await server._verify_server_running()
+
+        mock_connect.assert_awaited_once()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_start_does_not_retry_bind_errors(self, sample_tunnel_config):
+        """Test that only an address-in-use bind failure is retried."""
+        with (
+            patch("loco.network.server.web.AppRunner", return_value=AsyncMock()),
+            patch("loco.network.server.web.TCPSite") as mock_site_class,
+            patch("loco.network.server.ClientSession", return_value=AsyncMock()),
+        ):
+            mock_site = AsyncMock()
+            mock_site.start.side_effect = PermissionError(errno.EACCES, "denied")
+            mock_site_class.return_value = mock_site
+
+            server = TunnelServer(config=sample_tunnel_config)
+            server._is_port_in_use = AsyncMock(return_value=False)
+
+            with pytest.raises(TunnelError):
+                await server.start()
+
+            mock_site_class.assert_called_once()
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_stop(self, sample_tunnel_config):
@@ -71,12 +150,28 @@ class TestTunnelServer:
         assert server._site is None
         assert server._runner is None
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_serve_forever_returns_on_stop(self, sample_tunnel_config):
+        """Test serve_forever wakes up as soon as the server is stopped."""
+        server = TunnelServer(config=sample_tunnel_config)
+        server._runner = AsyncMock()
+        server._site = AsyncMock()
+
+        serving = asyncio.create_task(server.serve_forever())
+        await asyncio.sleep(0)
+        assert not serving.done()
+
+        await server.stop()
+        await asyncio.wait_for(serving, 1)
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_handle_http_request(self, sample_tunnel_config):
         """Test HTTP request handling."""
-        server = TunnelServer(config=sample_tunnel_config)
-        server.config.subdomain = "test"
+        server = TunnelServer(
+            config=sample_tunnel_config.model_copy(update={"subdomain": "test"})
+        )
 
         mock_request = MagicMock()
         mock_request.method = "GET"
@@ -107,57 +202,316 @@ class TestTunnelServer:
             assert resp == "ws_response"
             mock_proxy_ws.assert_called_once_with(mock_request)
 
-    @pytest.mark.slow
+    @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_proxy_http_success(self, sample_tunnel_config):
-        """Test successful HTTP request proxying."""
+    async def test_handle_request_dispatches_websocket_upgrade(
+        self, sample_tunnel_config
+    ):
+        """Test upgrade requests skip the HTTP connection bookkeeping."""
+        on_connection = MagicMock()
+        server = TunnelServer(config=sample_tunnel_config, on_connection=on_connection)
+        server._client_session = AsyncMock()
+
+        mock_request = MagicMock()
+        mock_request.headers = CIMultiDict({"Upgrade": "WebSocket"})
+
+        with patch.object(
+            server, "_handle_websocket_proxy", AsyncMock(return_value="ws_response")
+        ) as mock_proxy_ws:
+            resp = await server._handle_request(mock_request)
+
+        assert resp == "ws_response"
+        mock_proxy_ws.assert_awaited_once_with(mock_request)
+        on_connection.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_handle_request_releases_connection_on_error(
+        self, sample_tunnel_config
+    ):
+        """Test a failed proxy attempt still reports the disconnection."""
+        on_connection = MagicMock()
+        on_disconnection = MagicMock()
+        server = TunnelServer(
+            config=sample_tunnel_config,
+            on_connection=on_connection,
+            on_disconnection=on_disconnection,
+        )
+        server._client_session = MagicMock()
+        server._client_session.request.side_effect = ConnectionRefusedError()
+
+        mock_request = MagicMock()
+        mock_request.headers = CIMultiDict()
+        mock_request.query_string = ""
+
+        resp = await server._handle_request(mock_request)
+
+        assert resp.status == 502
+        on_connection.assert_called_once()
+        on_disconnection.assert_called_once()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_handle_health_check(self, sample_tunnel_config):
+        """Test the health check payload."""
         server = TunnelServer(config=sample_tunnel_config)
 
-        mock_request = AsyncMock()
-        mock_request.method = "GET"
-        mock_request.path = "/test"
-        mock_request.headers = {"Host": "example.com"}
+        resp = await server._handle_health_check(MagicMock())
+
+        assert resp.content_type == "application/json"
+        assert json.loads(resp.body) == {
+            "status": "healthy",
+            "tunnel_id": sample_tunnel_config.tunnel_id,
+            "local_service": (
+                f"{sample_tunnel_config.local_host}:{sample_tunnel_config.local_port}"
+            ),
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_handle_stats(self, sample_tunnel_config):
+        """Test the stats payload for a stored config and the live serving flag."""
+        config = TunnelConfig.model_validate(sample_tunnel_config.model_dump())
+        server = TunnelServer(config=config)
+
+        resp = await server._handle_stats(MagicMock())
+        stats = json.loads(resp.body)
+        assert resp.content_type == "application/json"
+        assert stats["config"]["tunnel_id"] == config.tunnel_id
+        assert stats["config"]["created_at"] == config.created_at.isoformat()
+        assert stats["server_info"]["is_serving"] is False
+
+        server._runner = MagicMock()
+        server._site = MagicMock()
+        resp = await server._handle_stats(MagicMock())
+        assert json.loads(resp.body)["server_info"]["is_serving"] is True
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_tunnel_endpoints_bypass_proxy(self, sample_tunnel_config):
+        """Test health and stats requests are routed away from the proxy handler."""
+        server = TunnelServer(config=sample_tunnel_config)
+
+        for path, handler in [
+            ("/_tunnel/health", server._handle_health_check),
+            ("/_tunnel/stats", server._handle_stats),
+            ("/_tunnel/other", server._handle_request),
+        ]:
+            request = make_mocked_request("GET", path, app=server._app)
+            match_info = await server._app.router.resolve(request)
+            assert match_info.handler == handler
+
+    @pytest.mark.unit
+    def test_build_target_url(self, sample_tunnel_config):
+        """Test target URLs keep the path and query for HTTP and WebSocket."""
+        server = TunnelServer(config=sample_tunnel_config)
+        local = f"{sample_tunnel_config.local_host}:{sample_tunnel_config.local_port}"
+
+        mock_request = MagicMock()
+        mock_request.path = "/api"
+        mock_request.query_string = "a=1"
+
+        assert server._build_target_url(mock_request) == f"http://{local}/api?a=1"
+
+        mock_request.query_string = ""
+        assert (
+            server._build_target_url(mock_request, server._local_ws_url)
+            == f"ws://{local}/api"
+        )
+
+    @pytest.mark.unit
+    def test_prepare_proxy_headers_drops_hop_by_hop(self, sample_tunnel_config):
+        """Test hop-by-hop headers are dropped regardless of their case."""
+        server = TunnelServer(config=sample_tunnel_config)
+
+        mock_request = MagicMock()
+        mock_request.headers = CIMultiDict(
+            {
+                "Transfer-Encoding": "chunked",
+                "Connection": "keep-alive",
+                "trailer": "Expires",
+                "X-Custom": "value",
+            }
+        )
         mock_request.remote = "192.168.1.1"
         mock_request.host = "example.com"
-        mock_request.query_string = ""
-        mock_request.can_read_body = True
-        mock_request.read = AsyncMock(return_value=b"request body")
-
-        mock_content = AsyncMock()
-        mock_content.read = AsyncMock(return_value=b"response content")
-        mock_content.__aenter__.return_value = mock_content
-
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.reason = "OK"
-        mock_response.headers = {"Content-Type": "text/plain"}
-        mock_response.content = mock_content
-
-        mock_session = AsyncMock()
-        mock_session_cm = AsyncMock()
-        mock_session_cm.__aenter__.return_value = mock_response
-        mock_session.request.return_value = mock_session_cm
-
-        response = web.Response(
-            status=200,
-            reason="OK",
-            headers={"Content-Type": "text/plain"},
-            text="response content",
+
+        headers = server._prepare_proxy_headers(mock_request)
+
+        assert "Transfer-Encoding" not in headers
+        assert "Connection" not in headers
+        assert "Trailer" not in headers
+        assert headers["X-Custom"] == "value"
+        assert headers["X-Forwarded-For"] == "192.168.1.1"
+        assert headers["Host"] == (
+            f"{sample_tunnel_config.local_host}:{sample_tunnel_config.local_port}"
         )
+        assert headers["X-Forwarded-Host"] == "example.com"
+        assert headers["X-Forwarded-Proto"] == sample_tunnel_config.protocol.value
+        assert headers["X-Forwarded-Port"] == str(sample_tunnel_config.remote_port)
 
-        with (
-            patch("loco.network.server.ClientSession", return_value=mock_session),
-            patch("loco.network.server.web.Response", return_value=response),
-        ):
-            server._client_session = mock_session
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_proxy_http_success(self, sample_tunnel_config):
+        """Test the proxied status, headers and body are streamed back."""
+        on_log_request = MagicMock()
+        server = TunnelServer(
+            config=sample_tunnel_config, on_log_request=on_log_request
+        )
 
-            resp = await server._handle_request(mock_request)
+        writer = MagicMock()
+        writer.write = AsyncMock()
+        writer.write_headers = AsyncMock()
+        writer.write_eof = AsyncMock()
+        writer.drain = AsyncMock()
+        payload = MagicMock()
+        payload.at_eof.return_value = False
+        request = make_mocked_request(
+            "POST",
+            "/test",
+            headers={"Host": "example.com", "Content-Type": "text/plain"},
+            writer=writer,
+            payload=payload,
+        )
 
-            assert "Content-Type" in resp.headers
-            assert resp.reason == "OK"
-            assert resp.status == 200
+        async def iter_any():
+            yield b"response "
+            yield b"content"
 
-            mock_session.request.assert_called_once()
+        upstream = MagicMock()
+        upstream.status = 201
+        upstream.reason = "Created"
+        upstream.headers = CIMultiDict(
+            {"Content-Type": "text/plain", "Connection": "keep-alive"}
+        )
+        upstream.content.iter_any = iter_any
+
+        upstream_cm = MagicMock()
+        upstream_cm.__aenter__ = AsyncMock(return_value=upstream)
+        upstream_cm.__aexit__ = AsyncMock(return_value=False)
+        session = MagicMock()
+        session.request = MagicMock(return_value=upstream_cm)
+        server._client_session = session
+
+        resp = await server._handle_request(request)
+
+        assert resp.status == 201
+        assert resp.reason == "Created"
+        assert resp.headers["Content-Type"] == "text/plain"
+        assert "Connection" not in resp.headers
+
+        status_line, _ = writer.write_headers.call_args.args
+        assert status_line == "HTTP/1.1 201 Created"
+        body = b"".join(bytes(c.args[0]) for c in writer.write.call_args_list)
+        assert body == b"response content"
+        writer.write_eof.assert_awaited_once()
+
+        (log_entry,) = on_log_request.call_args.args
+        assert (log_entry.method, log_entry.path, log_entry.status) == (
+            "POST",
+            "/test",
+            201,
+        )
+
+        session.request.assert_called_once()
+        request_kwargs = session.request.call_args.kwargs
+        assert request_kwargs["method"] == "POST"
+        assert request_kwargs["data"] is request.content
+        assert request_kwargs["skip_auto_headers"] == ("Content-Type",)
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_proxy_keeps_repeated_headers(self, sample_tunnel_config, free_port):
+        """Test repeated request and response headers survive the proxy."""
+
+        async def handler(request):
+            response = web.Response(text=",".join(request.headers.getall("X-Tag")))
+            response.headers.add("Set-Cookie", "a=1")
+            response.headers.add("Set-Cookie", "b=2")
+            return response
+
+        local_app = web.Application()
+        local_app.router.add_get("/", handler)
+        local_runner = web.AppRunner(local_app)
+        await local_runner.setup()
+        await web.TCPSite(local_runner, "127.0.0.1", 0).start()
+        local_port = local_runner.addresses[0][1]
+
+        server = TunnelServer(
+            config=sample_tunnel_config.model_copy(
+                update={
+                    "local_host": "127.0.0.1",
+                    "local_port": local_port,
+                    "remote_host": "127.0.0.1",
+                    "remote_port": free_port,
+                }
+            )
+        )
+        await server.start()
+
+        try:
+            async with (
+                ClientSession() as session,
+                session.get(
+                    f"http://127.0.0.1:{server.config.remote_port}/",
+                    headers=CIMultiDict([("X-Tag", "one"), ("X-Tag", "two")]),
+                ) as resp,
+            ):
+                assert await resp.text() == "one,two"
+                assert resp.headers.getall("Set-Cookie") == ["a=1", "b=2"]
+        finally:
+            await server.stop()
+            await local_runner.cleanup()
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_websocket_proxy_relays_frames(self, sample_tunnel_config, free_port):
+        """Test text and binary frames are relayed through a running server."""
+
+        async def echo(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await ws.send_str(msg.data.upper())
+                elif msg.type == WSMsgType.BINARY:
+                    await ws.send_bytes(msg.data[::-1])
+            return ws
+
+        local_app = web.Application()
+        local_app.router.add_get("/ws", echo)
+        local_runner = web.AppRunner(local_app)
+        await local_runner.setup()
+        local_site = web.TCPSite(local_runner, "127.0.0.1", 0)
+        await local_site.start()
+        local_port = local_runner.addresses[0][1]
+
+        server = TunnelServer(
+            config=sample_tunnel_config.model_copy(
+                update={
+                    "local_host": "127.0.0.1",
+                    "local_port": local_port,
+                    "remote_host": "127.0.0.1",
+                    "remote_port": free_port,
+                }
+            )
+        )
+        await server.start()
+
+        try:
+            async with (
+                ClientSession() as session,
+                session.ws_connect(
+                    f"http://127.0.0.1:{server.config.remote_port}/ws"
+                ) as ws,
+            ):
+                await ws.send_str("héllo")
+                assert (await ws.receive_str()) == "HÉLLO"
+                await ws.send_bytes(b"abc")
+                assert (await ws.receive_bytes()) == b"cba"
+        finally:
+            await server.stop()
+            await local_runner.cleanup()
 
     @pytest.mark.slow
     @pytest.mark.asyncio
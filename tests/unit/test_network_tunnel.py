@@ -3,7 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from loco.core.exceptions import TunnelStartupError
-from loco.core.models import TunnelConfig, TunnelProtocol, TunnelStatus
+from loco.core.models import LogEntry, TunnelConfig, TunnelProtocol, TunnelStatus
 from loco.network.tunnel import Tunnel
 
 
@@ -105,6 +105,18 @@ class TestTunnel:
 
         assert tunnel.state.last_activity is not None
 
+    def test_connection_callbacks_update_counters(self, sample_tunnel_config):
+        """Test the connection callbacks update counters without awaiting."""
+        tunnel = Tunnel(config=sample_tunnel_config)
+
+        tunnel._on_connection({"remote_addr": "127.0.0.1"})
+        assert tunnel.state.active_connections == 1
+        assert tunnel.state.total_connections == 1
+
+        tunnel._on_disconnection({"remote_addr": "127.0.0.1"})
+        assert tunnel.state.active_connections == 0
+        assert tunnel.state.total_connections == 1
+
     @pytest.mark.asyncio
     async def test_on_data_transfer(self, sample_tunnel_config):
         """Test data transfer callback."""
@@ -112,6 +124,59 @@ class TestTunnel:
 
         tunnel.state = MagicMock()
 
-        await tunnel._on_data_transfer(1024)
+        tunnel._on_data_transfer(1024)
 
         assert tunnel.state.last_activity is not None
+
+    def test_last_activity_refresh_is_throttled(self, sample_tunnel_config):
+        """Test traffic refreshes last_activity at most once per interval."""
+        tunnel = Tunnel(config=sample_tunnel_config)
+
+        with patch("loco.network.tunnel.time.monotonic", return_value=100.0):
+            tunnel._on_data_transfer(1)
+            first = tunnel.state.last_activity
+            tunnel._on_data_transfer(1)
+            assert tunnel.state.last_activity is first
+
+        with patch("loco.network.tunnel.time.monotonic", return_value=101.0):
+            tunnel._on_data_transfer(1)
+            assert tunnel.state.last_activity is not first
+
+        assert tunnel.state.bytes_transferred == 3
+
+    def test_log_handlers(self, sample_tunnel_config):
+        """Test registering and unregistering request log handlers."""
+        tunnel = Tunnel(config=sample_tunnel_config)
+        handler = MagicMock()
+        entry = LogEntry(
+            tunnel_id=sample_tunnel_config.tunnel_id,
+            timestamp="2023-01-01T12:00:00",
+            method="GET",
+            path="/",
+            status=200,
+            ip="127.0.0.1",
+            duration=1.5,
+            query_string="",
+            headers={},
+        )
+
+        tunnel.register_log_handler(handler)
+        tunnel._log_request(entry)
+        handler.assert_called_once_with(entry)
+
+        tunnel.unregister_log_handler(handler)
+        tunnel._log_request(entry)
+        handler.assert_called_once()
+
+    def test_log_handlers_toggle_server_logging(self, sample_tunnel_config):
+        """Test the server only builds request logs while handlers are registered."""
+        tunnel = Tunnel(config=sample_tunnel_config)
+        tunnel._server = MagicMock()
+        tunnel._server.on_log_request = None
+        handler = MagicMock()
+
+        tunnel.register_log_handler(handler)
+        assert tunnel._server.on_log_request == tunnel._log_request
+
+        tunnel.unregister_log_handler(handler)
+        assert tunnel._server.on_log_request is None
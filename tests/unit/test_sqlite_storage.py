@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+
+from loco.core.exceptions import StorageError
+from loco.storage.sqlite_storage import SqliteStorage
+
+
+@pytest.fixture
+async def sqlite_storage(temp_dir):
+    storage = SqliteStorage(db_path=temp_dir / "loco.db")
+    yield storage
+    await storage.close()
+
+
+@pytest.mark.unit
+class TestSqliteStorage:
+    @pytest.mark.asyncio
+    async def test_uses_wal_journal(self, sqlite_storage, sample_tunnel_config):
+        """Test that the database is opened in WAL mode."""
+        await sqlite_storage.save_tunnel_config(sample_tunnel_config)
+
+        with sqlite3.connect(sqlite_storage.db_path) as conn:
+            (mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+        assert mode == "wal"
+
+    @pytest.mark.asyncio
+    async def test_save_and_load_tunnel_config(
+        self, sqlite_storage, sample_tunnel_config
+    ):
+        """Test saving and loading a tunnel configuration."""
+        await sqlite_storage.save_tunnel_config(sample_tunnel_config)
+
+        loaded = await sqlite_storage.load_tunnel_config(
+            sample_tunnel_config.tunnel_id
+        )
+
+        assert loaded == sample_tunnel_config
+        assert await sqlite_storage.load_tunnel_config("nonexistent-id") is None
+
+    @pytest.mark.asyncio
+    async def test_list_tunnel_configs(self, sqlite_storage, sample_tunnel_config):
+        """Test listing configs, skipping tunnels that only have a state."""
+        config2 = sample_tunnel_config.model_copy(
+            update={"tunnel_id": "test-tunnel-id-2", "name": "Test Tunnel 2"}
+        )
+        await sqlite_storage.save_tunnel_config(sample_tunnel_config)
+        await sqlite_storage.save_tunnel_config(config2)
+        await sqlite_storage.save_tunnel_config(
+            config2.model_copy(update={"name": "Renamed"})
+        )
+
+        configs = await sqlite_storage.list_tunnel_configs()
+
+        names = {c.tunnel_id: c.name for c in configs}
+        assert names == {
+            sample_tunnel_config.tunnel_id: sample_tunnel_config.name,
+            config2.tunnel_id: "Renamed",
+        }
+
+    @pytest.mark.asyncio
+    async def test_save_and_load_tunnel_state(
+        self, sqlite_storage, sample_tunnel_state
+    ):
+        """Test a state can be stored with or without its config row."""
+        tunnel_id = sample_tunnel_state.config.tunnel_id
+        await sqlite_storage.save_tunnel_state(sample_tunnel_state)
+
+        assert await sqlite_storage.list_tunnel_configs() == []
+
+        await sqlite_storage.save_tunnel_config(sample_tunnel_state.config)
+        loaded = await sqlite_storage.load_tunnel_state(tunnel_id)
+
+        assert loaded is not None
+        assert loaded.status == sample_tunnel_state.status
+        assert loaded.public_url == sample_tunnel_state.public_url
+        assert await sqlite_storage.load_tunnel_config(tunnel_id) is not None
+        assert await sqlite_storage.load_tunnel_state("nonexistent-id") is None
+
+    @pytest.mark.asyncio
+    async def test_delete_tunnel(
+        self, sqlite_storage, sample_tunnel_config, sample_tunnel_state
+    ):
+        """Test deleting a tunnel removes both its config and state."""
+        await sqlite_storage.save_tunnel_config(sample_tunnel_config)
+        await sqlite_storage.save_tunnel_state(sample_tunnel_state)
+
+        await sqlite_storage.delete_tunnel(sample_tunnel_config.tunnel_id)
+        await sqlite_storage.delete_tunnel("nonexistent-id")
+
+        tunnel_id = sample_tunnel_config.tunnel_id
+        assert await sqlite_storage.load_tunnel_config(tunnel_id) is None
+        assert await sqlite_storage.load_tunnel_state(tunnel_id) is None
+
+    @pytest.mark.asyncio
+    async def test_storage_error(self, temp_dir, sample_tunnel_config):
+        """Test database failures are raised as StorageError."""
+        storage = SqliteStorage(db_path=temp_dir)
+
+        with pytest.raises(StorageError) as exc_info:
+            await storage.save_tunnel_config(sample_tunnel_config)
+
+        assert "Failed to save tunnel config" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_close_and_reopen(self, sqlite_storage, sample_tunnel_config):
+        """Test closing releases the connection and later calls reopen it."""
+        await sqlite_storage.save_tunnel_config(sample_tunnel_config)
+
+        await sqlite_storage.close()
+        assert sqlite_storage._conn is None
+
+        loaded = await sqlite_storage.load_tunnel_config(
+            sample_tunnel_config.tunnel_id
+        )
+        assert loaded == sample_tunnel_config